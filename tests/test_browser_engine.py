@@ -0,0 +1,156 @@
+# SPDX-License-Identifier: MIT
+"""Lane pool accounting, storage-state merge and small engine helpers (no browser needed)."""
+import asyncio
+import re
+
+import pytest
+
+from xssentinel.crawler.browser_engine import BrowserEngine, _merge_storage_states, _tag
+
+
+class FakeContext:
+    def __init__(self, name, storage_state=None):
+        self.name = name
+        self.state = storage_state or {"cookies": [{"name": name, "domain": "x", "path": "/"}], "origins": []}
+        self.closed = False
+
+    async def storage_state(self):
+        return self.state
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePage:
+    pass
+
+
+def _engine(tmp_path, **kw):
+    eng = BrowserEngine(evidence_dir=tmp_path / "ev", outdir=tmp_path, **kw)
+    eng.created = []
+
+    async def new_context(har_name, storage_state=None):
+        ctx = FakeContext(har_name, storage_state)
+        eng.created.append(ctx)
+        return ctx
+
+    async def new_page(context):
+        return FakePage()
+
+    eng._new_context = new_context
+    eng._new_page = new_page
+    return eng
+
+
+def test_lease_recycles_after_n_uses(tmp_path):
+    eng = _engine(tmp_path, recycle_every=2)
+
+    async def scenario():
+        async with eng._lane_pool("url") as pool:
+            (first,) = pool.har
+            for _ in range(2):
+                async with eng._lease(pool) as lane:
+                    assert lane is not None
+            (second,) = pool.har
+            assert second is not first
+            assert first[0].closed
+            assert pool.har[second] == ("session_url", 1)
+            assert pool.uses == {second: 0}
+            assert second[0].name == "session_url_r1.har"
+            # The replacement carries the old context's cookies/localStorage
+            assert second[0].state is first[0].state
+            assert pool.free.qsize() == 1
+        return second
+
+    second = asyncio.run(scenario())
+    assert second[0].closed
+
+
+def test_lease_skip_counts_no_use(tmp_path):
+    eng = _engine(tmp_path, recycle_every=1)
+
+    async def scenario():
+        async with eng._lane_pool("forms") as pool:
+            (lane,) = pool.har
+            async with eng._lease(pool, skip=lambda: True) as got:
+                assert got is None
+            assert pool.uses[lane] == 0
+            assert list(pool.har) == [lane]
+            assert pool.free.qsize() == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_recycle_keeps_the_old_lane(tmp_path):
+    eng = _engine(tmp_path, recycle_every=1)
+
+    async def scenario():
+        async with eng._lane_pool("url") as pool:
+            (lane,) = pool.har
+
+            async def broken_page(context):
+                raise RuntimeError("page crashed")
+
+            eng._new_page = broken_page
+            for n in (1, 2):
+                async with eng._lease(pool):
+                    pass
+                assert list(pool.har) == [lane]
+                assert pool.uses[lane] == n
+                assert not lane[0].closed
+                assert pool.free.qsize() == 1
+            # Replacements that never got a page are closed, not leaked
+            assert all(ctx.closed for ctx in eng.created[1:])
+
+    asyncio.run(scenario())
+
+
+def test_lane_pool_collects_states_on_close(tmp_path):
+    eng = _engine(tmp_path, concurrency=3, storage_state_path=tmp_path / "state.json")
+
+    async def scenario():
+        async with eng._lane_pool("url") as pool:
+            lanes = list(pool.har)
+            assert [pool.har[lane][0] for lane in lanes] == ["session_url_0", "session_url_1", "session_url_2"]
+        return lanes
+
+    lanes = asyncio.run(scenario())
+    assert all(lane[0].closed for lane in lanes)
+    assert len(eng._lane_states) == 3
+
+
+def test_merge_storage_states_later_wins():
+    a = {
+        "cookies": [{"name": "sid", "domain": "x", "path": "/", "value": "old"},
+                    {"name": "keep", "domain": "x", "path": "/", "value": "1"}],
+        "origins": [{"origin": "https://x", "localStorage": [{"name": "k", "value": "old"}]}],
+    }
+    b = {
+        "cookies": [{"name": "sid", "domain": "x", "path": "/", "value": "new"},
+                    {"name": "sid", "domain": "x", "path": "/app", "value": "app"}],
+        "origins": [{"origin": "https://x", "localStorage": [{"name": "k", "value": "new"}]}],
+    }
+    merged = _merge_storage_states([a, b])
+    assert {(c["name"], c["path"]): c["value"] for c in merged["cookies"]} == {
+        ("sid", "/"): "new", ("keep", "/"): "1", ("sid", "/app"): "app",
+    }
+    assert merged["origins"] == b["origins"]
+    assert _merge_storage_states([]) == {"cookies": [], "origins": []}
+
+
+@pytest.mark.parametrize("payload", ["", "<svg onload=x>", "é" * 500])
+def test_tag_is_stable_10_hex(payload):
+    assert re.fullmatch(r"[0-9a-f]{10}", _tag(payload))
+    assert _tag(payload) == _tag(payload)
+
+
+def test_store_csp_memoizes_parsed_policy(tmp_path):
+    eng = BrowserEngine(evidence_dir=tmp_path / "ev", outdir=tmp_path)
+    eng._store_csp("script-src 'self'", "https://a")
+    parsed = eng.last_csp
+    eng._store_csp("script-src 'self'", "https://b")
+    assert eng.last_csp is parsed
+    assert eng.csp_by_origin == {"https://a": parsed, "https://b": parsed}
+    eng._store_csp(None, "https://c")
+    assert eng.last_csp is None
+    assert eng.csp_by_origin["https://c"] == {}
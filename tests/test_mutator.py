@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: MIT
+"""Seeded payload sets must be reproducible (memoized catalog, external wordlists, evasions)."""
+import asyncio
+import random
+
+from xssentinel.payloads import mutator
+from xssentinel.payloads.evasions import apply_all
+
+CSP_STRICT = {"raw": "script-src 'self'"}
+
+
+def _build(**kw):
+    args = {"csp": None, "marker": "XSSMARK", "sink_hints": [], "external_paths": [], "seed": 1337}
+    args.update(kw)
+    return asyncio.run(mutator.build_payloads(**args))
+
+
+def _fresh(**kw):
+    """Same build with an empty catalog cache (what a new process would compute)."""
+    mutator._catalog.cache_clear()
+    return _build(**kw)
+
+
+def test_seeded_build_is_stable_across_calls():
+    first = _fresh()
+    random.random()  # unrelated draws between scans must not leak into the next set
+    assert _build() == first
+    assert _fresh() == first
+
+
+def test_seeded_build_with_csp_and_wordlist(tmp_path):
+    wl = tmp_path / "extra.txt"
+    wl.write_text("<script>{JSCMD}</script>\n<b>{MARKER}</b>\n# comment\n", encoding="utf-8")
+    for mode in ("extend", "replace"):
+        kw = {"csp": CSP_STRICT, "external_paths": [str(wl)], "mode": mode}
+        first = _fresh(**kw)
+        assert first
+        assert _build(**kw) == first
+        assert _fresh(**kw) == first
+
+
+def test_memoized_catalog_matches_unmemoized_run():
+    templates = tuple(mutator.BASE_TEMPLATES)
+    flags = mutator._csp_flags(CSP_STRICT)
+    mutator._catalog.cache_clear()
+    cached = mutator._catalog(templates, flags, "XSSMARK", 7)
+    assert mutator._catalog.__wrapped__(templates, flags, "XSSMARK", 7) == cached
+
+
+def test_seed_and_cap_change_the_set():
+    assert _fresh(seed=1) != _fresh(seed=2)
+    assert _build(max_payloads=5) == _build(max_payloads=0)[:5]
+
+
+def test_evasions_reproducible_under_seed():
+    payload = '"><img src=x onerror="document.title=1">'
+    random.seed(42)
+    first = apply_all(payload)
+    random.seed(42)
+    assert apply_all(payload) == first
+    assert first[0] == payload
+    assert len(first) == len(set(first))
@@ -12,9 +12,15 @@ import asyncio
 import json
 import os
 import random
-import string
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
+
+try:  # optional fast JSON encoder
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
 
 from ..crawler.browser_engine import BrowserEngine
 from ..payloads.mutator import build_payloads
@@ -22,105 +28,204 @@ from ..reports.reporter import render_table
 
 
 def _rand_marker(n: int = 6) -> str:
-    return "".join(random.choice(string.hexdigits.lower()) for _ in range(n))
-
-
-def _print_stdout(findings: List[Dict], mode: str = "table") -> None:
+    # One C call; leaves the seeded `random` stream (payload sampling) untouched
+    return os.urandom((n + 1) // 2).hex()[:n]
+
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when available, stdlib otherwise)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None).encode("utf-8")
+
+
+def _write_stdout(data: bytes) -> None:
+    """Write raw bytes to stdout, keeping ordering with earlier print() calls."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.flush()
+
+
+def _wrap_ndjson(src: Path, dst: Path) -> None:
+    """Turn a findings .ndjson stream into {"findings": [...]} without re-parsing it."""
+    with src.open("rb") as fin, dst.open("wb") as fout:
+        fout.write(b'{"findings":[')
+        first = True
+        for line in fin:
+            line = line.rstrip(b"\n")
+            if not line:
+                continue
+            if not first:
+                fout.write(b",")
+            fout.write(line)
+            first = False
+        fout.write(b"]}\n")
+
+
+def _state_has_cookies(path: Path) -> bool:
+    """True if a saved Playwright storage state exists and actually holds cookies."""
+    try:
+        return bool(json.loads(path.read_bytes()).get("cookies"))
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def _print_stdout(findings: List[Dict], mode: str = "auto") -> None:
+    if mode == "auto":
+        # Nobody reads a table in CI logs/pipes: skip building it there
+        mode = "table" if sys.stdout.isatty() else "summary"
     if mode == "json":
-        print(json.dumps({"findings": findings}, ensure_ascii=False, indent=2))
+        _write_stdout(_dumps({"findings": findings}, pretty=True) + b"\n")
     elif mode == "ndjson":
-        for f in findings:
-            print(json.dumps(f, ensure_ascii=False))
+        # One coalesced write instead of one syscall per finding
+        _write_stdout(b"".join(_dumps(f) + b"\n" for f in findings))
     elif mode == "summary":
         total = len(findings)
-        execs = sum(1 for f in findings if f.get("executed"))
-        refls = sum(1 for f in findings if f.get("reflected"))
+        execs = refls = 0
+        for f in findings:  # single pass over findings
+            execs += bool(f.get("executed"))
+            refls += bool(f.get("reflected"))
         print(f"Total: {total}  |  Executed: {execs}  |  Reflected: {refls}")
     else:  # table (default)
         print(render_table(findings))
 
 
 async def run(args: argparse.Namespace) -> int:
+    # Output layout, resolved once and handed to the engine as-is
     outdir = Path(args.out).resolve()
-    outdir.mkdir(parents=True, exist_ok=True)
+    evidence_dir = outdir / "evidences"
+    ndjson_path = outdir / "report.ndjson"
+    report_path = outdir / "report.json"
+    state_path = outdir / "storage_state.json" if args.persist_session else None
+    evidence_dir.mkdir(parents=True, exist_ok=True)  # creates outdir too
 
     marker = args.marker or _rand_marker(6)
     print(f"Target: {args.url}    marker={marker}")
 
-    async with BrowserEngine(
-        headless=args.headless,
-        timeout_ms=args.timeout_ms,
-        evidence_dir=outdir / "evidences",
-        user_agent=args.user_agent,
-        pacing_ms=args.pacing_ms,
-        jitter_pct=args.jitter_pct,
-        ua_mode=args.ua_rotate,
-        trace_on_hit=args.trace_on_hit,
-        outdir=outdir,
-        warmup_requests=args.warmup_requests,
-        warmup_wait_ms=args.warmup_wait_ms,
-    ) as eng:
-
-        # Build payloads (CSP-aware + external wordlists)
-        # First navigate once to capture CSP if requested
-        if args.csp_aware:
-            await eng.navigate(args.url)
-
-        payloads = await build_payloads(
-            csp=eng.get_csp_info() if args.csp_aware else None,
-            marker=marker,
-            sink_hints=[],  # can be filled after first pass if you loop
-            external_paths=args.wordlist or [],
-            mode=args.wordlist_mode,
-            max_payloads=args.max_payloads,
-            seed=args.seed,
-        )
-
-        findings: List[Dict] = []
-
-        # URL param fuzzing (preserve query + fragment fallback)
-        if args.fuzz_url:
-            fz = await eng.fuzz_url_params(
-                base_url=args.url,
+    # Reuse cookies/localStorage from a previous run: the WAF/CDN is already primed
+    if state_path and _state_has_cookies(state_path):
+        args.warmup_requests = 0
+
+    # Findings are streamed to report.ndjson as they are produced (no big in-memory dump)
+    with ndjson_path.open("wb") as stream:
+        def on_finding(f: Dict) -> None:
+            stream.write(_dumps(f) + b"\n")
+
+        async with BrowserEngine(
+            headless=args.headless,
+            timeout_ms=args.timeout_ms,
+            evidence_dir=evidence_dir,
+            user_agent=args.user_agent,
+            pacing_ms=args.pacing_ms,
+            jitter_pct=args.jitter_pct,
+            ua_mode=args.ua_rotate,
+            trace_on_hit=args.trace_on_hit,
+            outdir=outdir,
+            warmup_requests=args.warmup_requests,
+            warmup_wait_ms=args.warmup_wait_ms,
+            http_prefilter=args.http_prefilter,
+            on_finding=on_finding,
+            storage_state_path=state_path,
+            concurrency=args.concurrency,
+            nav_timeout_ms=args.nav_timeout_ms,
+            exec_timeout_ms=args.exec_timeout_ms,
+            exec_retry_ms=args.exec_retry_ms,
+            recycle_every=args.recycle_every,
+            settle_ms=args.settle_ms,
+            block_resources=args.block_resources.split(",") if args.block_resources else None,
+            skip_stack_capture=args.skip_stack_capture,
+            trace_min_interval_s=args.trace_min_interval_s,
+            trace_reflected=args.trace_reflected,
+            record_har=args.har or args.har_minimal,
+            har_minimal=args.har_minimal,
+            stop_on_executed=args.stop_on_executed,
+            screenshot_policy=args.screenshots,
+            evidence_quality=args.evidence_quality,
+        ) as eng:
+
+            # Build payloads (CSP-aware + external wordlists)
+            # Capture CSP first if requested (plain HTTP; full navigation as fallback)
+            if args.csp_aware:
+                try:
+                    await eng.fetch_csp(args.url)
+                    await eng.warmup(args.url)
+                except Exception:
+                    await eng.navigate(args.url)
+
+            payloads = await build_payloads(
+                csp=eng.get_csp_info() if args.csp_aware else None,
                 marker=marker,
-                payloads=payloads,
-                max_params=args.max_params,
-                backoff_ms=args.backoff_ms,
+                sink_hints=[],  # can be filled after first pass if you loop
+                external_paths=args.wordlist or [],
+                mode=args.wordlist_mode,
+                max_payloads=args.max_payloads,
+                seed=args.seed,
             )
-            findings.extend(fz)
-
-        # Form fuzzing
-        if args.fuzz_forms:
-            ff = await eng.fuzz_forms(
-                url=args.url,
-                marker=marker,
-                payloads=payloads,
-                max_forms=args.max_forms,
-            )
-            findings.extend(ff)
-
-        # Always write a JSON (artefato útil em CI), mas nada de PDF/HTML aqui
-        (outdir / "report.json").write_text(
-            json.dumps({"findings": findings}, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
 
-        # Print to terminal
-        _print_stdout(findings, args.stdout)
+            findings: List[Dict] = []
+            phases = []
+
+            # URL param fuzzing (preserve query + fragment fallback)
+            if args.fuzz_url:
+                phases.append(eng.fuzz_url_params(
+                    base_url=args.url,
+                    marker=marker,
+                    payloads=payloads,
+                    max_params=args.max_params,
+                    backoff_ms=args.backoff_ms,
+                ))
+
+            # Form fuzzing
+            if args.fuzz_forms:
+                fuzz_forms = eng.fuzz_forms_fast if args.fast_forms else eng.fuzz_forms
+                phases.append(fuzz_forms(
+                    url=args.url,
+                    marker=marker,
+                    payloads=payloads,
+                    max_forms=args.max_forms,
+                ))
+
+            # Phases run concurrently, each in its own browser context
+            for phase_findings in await asyncio.gather(*phases):
+                findings.extend(phase_findings)
+
+    # Always write a JSON (useful artifact in CI), but no PDF/HTML here
+    _wrap_ndjson(ndjson_path, report_path)
+
+    # Print to terminal
+    _print_stdout(findings, args.stdout)
 
     return 0
 
 
+@lru_cache(maxsize=1)
 def build_parser() -> argparse.ArgumentParser:
+    # Built once per process; parse_args() does not mutate the parser, so reuse is safe
     p = argparse.ArgumentParser(description="XSSentinel — Playwright-powered XSS scanner (terminal-first).")
 
     # Target
     p.add_argument("--url", required=True, help="Target URL (authorized scope).")
     p.add_argument("--headless", action="store_true", default=True, help="Run headless (default).")
     p.add_argument("--timeout-ms", type=int, default=15000)
+    p.add_argument("--nav-timeout-ms", type=int, default=1500,
+                   help="Per-probe navigation budget; probes do not wait for the page to finish loading. "
+                        "A probe that misses it is retried once with the full page timeout.")
+    p.add_argument("--exec-timeout-ms", type=int, default=800,
+                   help="How long each probe waits for the payload to execute.")
+    p.add_argument("--exec-retry-ms", type=int, default=3000,
+                   help="Extra execution wait for probes that reflected but did not execute (0 = off).")
+    p.add_argument("--block-resources", nargs="?", const="image,media,font", default=None,
+                   help="Abort these Playwright resource types (comma-separated; bare flag: image,media,font). "
+                        "Stylesheets are not blocked by default: CSS-animation payloads need the page's CSS.")
+    p.add_argument("--skip-stack-capture", action="store_true",
+                   help="Skip Playwright's per-call stack capture while scanning (faster; error messages "
+                        "lose their API-name prefix). Ignored with --trace-on-hit.")
+    p.add_argument("--settle-ms", type=int, default=300,
+                   help="Extra wait before the reflection check when nothing executed (late XHR content).")
     p.add_argument("--out", default="./results", help="Output directory for evidences/trace/HAR/report.json")
     p.add_argument("--seed", type=int, default=1337)
-    p.add_argument("--marker", default=None, help="Custom marker value to detect reflections/exec.")
+    p.add_argument("--max-payloads", type=int, default=300, help="Cap on payload variants (0 = no cap).")
+    p.add_argument("--marker", default=None, help="Custom marker value to detect reflections/exec (random per run if omitted).")
 
     # CSP-aware
     p.add_argument("--csp-aware", action="store_true", help="Capture CSP and adapt payload selection.")
@@ -129,9 +234,19 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--fuzz-url", action="store_true", help="Fuzz URL parameters (preserve query + fragment fallback).")
     p.add_argument("--max-params", type=int, default=8)
     p.add_argument("--backoff-ms", type=int, default=500)
+    p.add_argument("--http-prefilter", action="store_true",
+                   help="Pre-check URL params over plain HTTP; only render URLs that reflect the marker.")
 
     p.add_argument("--fuzz-forms", action="store_true", help="Fuzz HTML forms (named inputs).")
+    p.add_argument("--no-stop-on-executed", dest="stop_on_executed", action="store_false",
+                   help="Keep trying payloads on a field/param after one already executed.")
     p.add_argument("--max-forms", type=int, default=10)
+    p.add_argument("--fast-forms", action="store_true",
+                   help="Pre-submit forms with in-page fetch(); only render submissions that echo the payload.")
+    p.add_argument("--concurrency", type=int, default=1,
+                   help="Browser contexts per fuzz phase; probes run in parallel across them.")
+    p.add_argument("--recycle-every", type=int, default=50,
+                   help="Recycle each browser context after N probes, keeping cookies/storage (0 = never).")
 
     # WAF tuning
     p.add_argument("--user-agent", default=None)
@@ -140,9 +255,22 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--warmup-wait-ms", type=int, default=800)
     p.add_argument("--pacing-ms", type=int, default=0)
     p.add_argument("--jitter-pct", type=float, default=0.0)
+    p.add_argument("--persist-session", action="store_true",
+                   help="Save cookies/localStorage to <out>/storage_state.json and reuse them "
+                        "on the next run (warm-up is skipped when the saved state has cookies).")
 
     # Evidence
-    p.add_argument("--trace-on-hit", action="store_true", help="Export a Playwright trace ZIP per hit.")
+    p.add_argument("--screenshots", choices=["none", "viewport", "full"], default="viewport",
+                   help="Evidence screenshots per finding (executed hits are always captured full-page).")
+    p.add_argument("--evidence-quality", type=int, default=70,
+                   help="JPEG quality for evidence screenshots (0 = lossless PNG).")
+    p.add_argument("--har", action="store_true", help="Record session HAR files (one per browser context).")
+    p.add_argument("--har-minimal", action="store_true",
+                   help="Record HAR without response bodies or timings (much smaller; implies --har).")
+    p.add_argument("--trace-on-hit", action="store_true", help="Export a Playwright trace ZIP per executed hit.")
+    p.add_argument("--trace-reflected", action="store_true", help="Also export traces for reflected-only hits.")
+    p.add_argument("--trace-min-interval-s", type=float, default=5.0,
+                   help="Minimum seconds between trace exports per context (hits in between share the last trace).")
 
     # Wordlists externas
     p.add_argument("--wordlist", action="append", help="External wordlist file (can be repeated).")
@@ -150,18 +278,32 @@ def build_parser() -> argparse.ArgumentParser:
                    help="How to use external payloads: extend built-ins (default) or replace them.")
 
     # Terminal output
-    p.add_argument("--stdout", choices=["table", "json", "ndjson", "summary"], default="table",
-                   help="How to print results to the terminal.")
+    p.add_argument("--stdout", choices=["auto", "table", "json", "ndjson", "summary"], default="auto",
+                   help="How to print results to the terminal (auto: table on a TTY, summary otherwise).")
 
     return p
 
 
-def main() -> None:
-    parser = build_parser()
-    args = parser.parse_args()
+def _use_uvloop() -> None:
+    """Switch asyncio to uvloop when installed (not available on Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+async def main_async(argv: Optional[List[str]] = None) -> int:
+    """Parse argv and run a scan on the current event loop (reusable from tests/embedders)."""
+    args = build_parser().parse_args(argv)
     # Ensure deterministic transforms if seed given
     random.seed(args.seed)
-    exit(asyncio.run(run(args)))
+    return await run(args)
+
+
+def main() -> None:
+    _use_uvloop()
+    sys.exit(asyncio.run(main_async()))
 
 
 if __name__ == "__main__":
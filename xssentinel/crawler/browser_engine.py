@@ -6,25 +6,39 @@ BrowserEngine: Playwright-based crawler/fuzzer with CSP capture, WAF tuning and
 
 Features:
 - Headless Chromium context with optional session HAR recording.
+- Optional module-level browser pool (warm Chromium reuse across engines, see
+  `browser_pool_size` / `close_browser_pool()`).
 - Optional trace-on-hit (exports a Playwright trace ZIP per finding).
 - User-Agent rotation (session/per-request).
 - Pacing with jitter to smooth request bursts against WAF/CDN rate limits.
 - Per-origin CSP capture (header + basic <meta http-equiv="content-security-policy">).
-- Form fuzzing and URL parameter fuzzing with fragment (#) fallback for SPA routers.
+- Optional plain-HTTP fast path (Playwright APIRequestContext) for CSP capture and
+  reflection pre-filtering of URL parameters.
+- Form fuzzing and URL parameter fuzzing with fragment (#) fallback for SPA routers,
+  fanned out over a pool of browser contexts (see `concurrency`).
 - Sink capture (document.write, innerHTML, insertAdjacentHTML, setAttribute on*, location/history APIs).
-- Evidence: screenshots, trace ZIP, session HAR.
+- Evidence: screenshots, trace ZIP, session HAR (opt-in, one file per context).
+- Optional session persistence across runs (Playwright storage_state).
+- Opt-in (skip_stack_capture): Playwright's per-call stack capture is disabled
+  while the engine is open, unless tracing.
 
 All code and comments are in English by request.
 """
 from __future__ import annotations
 
 import asyncio
+import json
 import random
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from hashlib import blake2b as _blake2b
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-from urllib.parse import urlencode, urlparse, parse_qsl, urlunparse, quote
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from urllib.parse import ParseResult, urlencode, urlparse, parse_qsl, urlunparse, quote, quote_plus
 
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Response
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Response, Route
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 # Internal helpers (provided by the rest of the project)
 from ..detector.sandbox_executor import (
@@ -32,7 +46,308 @@ from ..detector.sandbox_executor import (
     inject_init_script,
     get_sink_log,
 )
-from ..utils.csp import parse_csp
+from ..utils.csp import extract_meta_csp, parse_csp
+
+Lane = Tuple[BrowserContext, Page]
+
+
+def _tag(p: str) -> str:
+    """Stable 10-hex evidence tag for a payload (hash() is salted per process)."""
+    return _blake2b(p.encode("utf-8"), digest_size=5).hexdigest()
+
+
+async def _run_all(*aws: Coroutine[Any, Any, Any]) -> List[Any]:
+    """
+    gather()-style fan-out returning results in order. Uses asyncio.TaskGroup on 3.11+
+    (less scheduling overhead, and siblings are cancelled if one probe blows up).
+    """
+    if not hasattr(asyncio, "TaskGroup"):
+        return await asyncio.gather(*aws)
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(aw) for aw in aws]
+    return [t.result() for t in tasks]
+
+
+@lru_cache(maxsize=1024)
+def _plan_params(
+    base_url: str, max_params: int
+) -> Tuple[ParseResult, Tuple[Tuple[str, str], ...], Tuple[str, ...]]:
+    """(parsed URL, existing query pairs, params to fuzz) for a base URL; memoized (immutable)."""
+    # Parse and preserve existing query
+    parsed = urlparse(base_url)
+    orig_params = parse_qsl(parsed.query, keep_blank_values=True)
+
+    # Build a small param pool (existing + a few synthetic)
+    param_candidates = [k for (k, _) in orig_params]
+    synthetic = ["q", "query", "search", "id", "name", "title"]
+    for s in synthetic:
+        if s not in param_candidates:
+            param_candidates.append(s)
+
+    param_candidates = param_candidates[: max_params if max_params > 0 else len(param_candidates)]
+    return parsed, tuple(orig_params), tuple(param_candidates)
+
+
+# Payload slot of the per-param URL templates (only URL-safe characters)
+_URL_SLOT = "__XSSENTINEL_SLOT__"
+
+
+def _merge_storage_states(states: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Union of Playwright storage states; later states win per cookie (name, domain, path) / origin."""
+    cookies: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    origins: Dict[str, Dict[str, Any]] = {}
+    for st in states:
+        for c in st.get("cookies") or []:
+            cookies[(c.get("name", ""), c.get("domain", ""), c.get("path", ""))] = c
+        for o in st.get("origins") or []:
+            origins[o.get("origin", "")] = o
+    return {"cookies": list(cookies.values()), "origins": list(origins.values())}
+
+
+def _unique_by_tag(payloads: List[str]) -> List[str]:
+    """Drop payloads whose evidence tag was already seen (keeps first occurrence/order)."""
+    seen_tags: Set[str] = set()
+    out = []
+    for p in payloads:
+        t = _tag(p)
+        if t not in seen_tags:
+            seen_tags.add(t)
+            out.append(p)
+    return out
+
+# Page origin + <meta> CSP, fetched together after each navigate()
+_ORIGIN_META_CSP_JS = """
+() => {
+  const m = document.querySelector('meta[http-equiv="content-security-policy"]');
+  return {origin: location.origin, csp: m ? m.getAttribute('content') : null};
+}
+"""
+
+# Where the marker landed: offset into the serialized DOM + ~80 chars of context each side
+_REFLECTION_SNIPPET_JS = """
+(m) => {
+  const html = document.documentElement ? document.documentElement.outerHTML : '';
+  const i = html.indexOf(m);
+  return i === -1 ? null : {offset: i, snippet: html.slice(Math.max(0, i - 80), i + m.length + 80)};
+}
+"""
+
+# Post-probe page state in one round-trip: where the marker landed (as above) + sink log
+_PROBE_STATE_JS = """
+(m) => {
+  const html = document.documentElement ? document.documentElement.outerHTML : '';
+  const i = html.indexOf(m);
+  return {
+    reflection: i === -1 ? null : {offset: i, snippet: html.slice(Math.max(0, i - 80), i + m.length + 80)},
+    sinks: window.__xssentinel_sinks || [],
+  };
+}
+"""
+
+_HASHCHANGE_JS = "() => window.dispatchEvent(new HashChangeEvent('hashchange'))"
+
+# Same-document fragment probe: clear the previous probe's sink log, then route via the hash
+_SET_HASH_JS = """
+(h) => {
+  window.__xssentinel_sinks = [];
+  location.hash = h;
+  window.dispatchEvent(new HashChangeEvent('hashchange'));
+}
+"""
+
+# Forms and their named fields, collected in a single evaluate (same selector as the fill step)
+_FORMS_SNAPSHOT_JS = """
+() => Array.from(document.forms).map((f, i) => ({
+  idx: i,
+  action: f.action,
+  fields: Array.from(f.querySelectorAll('input[name], textarea[name]')).map(e => e.getAttribute('name')).filter(Boolean),
+}))
+"""
+
+# Can the lane's current document host the next probe as-is? Only if it was loaded with
+# the init script (fill helper, hooks, exec signal), the form at idx is still the one the
+# snapshot saw (same action and field names: a same-URL POST response may render another
+# form there) and nothing from an earlier probe (exec flag, marker in the DOM) lingers;
+# the sink log is reset so the next probe starts clean, as after a fresh navigation.
+_FORM_REUSABLE_JS = """
+([idx, m, action, fields]) => {
+  const f = document.forms[idx];
+  const same = !!f && f.action === action && JSON.stringify(
+    Array.from(f.querySelectorAll('input[name], textarea[name]')).map(e => e.getAttribute('name')).filter(Boolean)
+  ) === JSON.stringify(fields);
+  const ok = typeof window.__xssentinel_fill === 'function'
+    && same && !window.__xssentinel_exec
+    && !!document.documentElement && document.documentElement.outerHTML.indexOf(m) === -1;
+  if (ok) window.__xssentinel_sinks = [];
+  return ok;
+}
+"""
+
+# Fill + submit in one hop; the helper itself ships once with the init script
+_FILL_SUBMIT_JS = "(d) => window.__xssentinel_fill(d.idx, d.values)"
+
+# Same field filling as window.__xssentinel_fill (sandbox_executor), but sent with fetch()
+# and the response body returned. Runs on the un-instrumented form page, so it is self-contained.
+_FETCH_SUBMIT_JS = """
+async (data) => {
+  const f = document.forms[data.idx];
+  if (!f) throw new Error('form ' + data.idx + ' not found');
+  const skip = ['hidden', 'checkbox', 'radio', 'file', 'submit', 'button', 'image', 'reset'];
+  const fd = new FormData(f);
+  for (const el of f.querySelectorAll('input[name], textarea[name]')) {
+    const nm = el.getAttribute('name');
+    if (!(nm in data.values) || el.disabled || el.readOnly || skip.includes((el.type || '').toLowerCase())) continue;
+    fd.set(nm, data.values[nm]);
+  }
+  const method = (f.method || 'get').toUpperCase();
+  let target = f.action || location.href;
+  const init = {method, credentials: 'include'};
+  if (method === 'GET') {
+    const u = new URL(target, location.href);
+    u.search = new URLSearchParams(fd).toString();
+    target = u.href;
+  } else {
+    init.body = f.enctype === 'multipart/form-data' ? fd : new URLSearchParams(fd);
+  }
+  const r = await fetch(target, init);
+  return {status: r.status, text: await r.text()};
+}
+"""
+
+
+class _ModuleProxy:
+    """Stand-in for a module: selected attributes overridden, the rest delegated."""
+
+    def __init__(self, module: Any, **overrides: Any):
+        self._module = module
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._module, name)
+
+
+# Engines currently holding the stack patch, and the original modules to put back
+_stack_patch_refs = 0
+_stack_patch_saved: Optional[Tuple[Any, Any]] = None
+
+
+def _patch_playwright_stack() -> None:
+    """
+    Playwright walks the Python stack on every API call (inspect.currentframe() +
+    traceback.extract_stack()) to label calls in traces and error messages. In fuzz
+    loops issuing thousands of calls that is a real share of CPU, so engines can
+    opt in (skip_stack_capture) to swapping those helpers for no-ops, only inside
+    playwright._impl._connection. The cost: calls are sent unlabeled (as internal),
+    error messages lose their "Page.goto:"-style prefix and traces lose API names.
+    Reference-counted: pair every call with _unpatch_playwright_stack().
+    """
+    global _stack_patch_refs, _stack_patch_saved
+    _stack_patch_refs += 1
+    if _stack_patch_refs > 1:
+        return
+    try:
+        import inspect
+        import traceback
+        import playwright._impl._connection as pw_conn
+    except Exception:
+        return
+    _stack_patch_saved = (pw_conn.inspect, pw_conn.traceback)
+    pw_conn.inspect = _ModuleProxy(inspect, stack=lambda *a, **k: [], currentframe=lambda: None)
+    pw_conn.traceback = _ModuleProxy(traceback, extract_stack=lambda *a, **k: traceback.StackSummary())
+
+
+def _unpatch_playwright_stack() -> None:
+    """Drop one reference to the stack patch; the last one restores Playwright's modules."""
+    global _stack_patch_refs, _stack_patch_saved
+    if _stack_patch_refs <= 0:
+        return
+    _stack_patch_refs -= 1
+    if _stack_patch_refs or _stack_patch_saved is None:
+        return
+    import playwright._impl._connection as pw_conn
+    pw_conn.inspect, pw_conn.traceback = _stack_patch_saved
+    _stack_patch_saved = None
+
+
+# ---------------------------
+# Browser pool (warm starts for engines opened one after another in one process)
+# ---------------------------
+_pool_pw = None
+_pool_lock: Optional[asyncio.Lock] = None  # guards the lazy driver start; created on first use
+_idle_browsers: Dict[bool, List[Browser]] = {}  # headless -> idle, still-connected browsers
+_browser_uses: Dict[Browser, int] = {}
+
+
+async def acquire_browser(headless: bool = True) -> Browser:
+    """Take an idle pooled Chromium (same headless mode) or launch a new one."""
+    global _pool_pw, _pool_lock
+    idle = _idle_browsers.setdefault(headless, [])
+    while idle:
+        browser = idle.pop()
+        if browser.is_connected():
+            return browser
+        _browser_uses.pop(browser, None)
+    if _pool_pw is None:
+        if _pool_lock is None:
+            _pool_lock = asyncio.Lock()
+        # Engines entering concurrently would otherwise each start (and leak) a driver
+        async with _pool_lock:
+            if _pool_pw is None:
+                _pool_pw = await async_playwright().start()
+    return await _pool_pw.chromium.launch(headless=headless)
+
+
+async def release_browser(browser: Browser, headless: bool, pool_size: int, max_uses: int) -> None:
+    """
+    Return a browser to the pool, or close it when the pool is full, the browser
+    died, or it has served max_uses sessions (long-lived Chromiums grow in memory).
+    """
+    uses = _browser_uses.pop(browser, 0) + 1
+    idle = _idle_browsers.setdefault(headless, [])
+    if browser.is_connected() and uses < max_uses and len(idle) < pool_size:
+        _browser_uses[browser] = uses
+        idle.append(browser)
+        return
+    try:
+        await browser.close()
+    except Exception:
+        pass
+
+
+async def close_browser_pool() -> None:
+    """Close every pooled browser and the pool's Playwright driver (call before the loop ends)."""
+    global _pool_pw, _pool_lock
+    for idle in _idle_browsers.values():
+        for browser in idle:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+    _idle_browsers.clear()
+    _browser_uses.clear()
+    if _pool_pw is not None:
+        await _pool_pw.stop()
+        _pool_pw = None
+    _pool_lock = None  # the lock binds to this loop; the next loop gets a fresh one
+
+
+class _LanePool:
+    """Lanes of one fuzz phase: the free-lane queue plus per-lane HAR base name, generation and use count."""
+
+    def __init__(self) -> None:
+        self.free: "asyncio.Queue[Lane]" = asyncio.Queue()
+        self.har: Dict[Lane, Tuple[str, int]] = {}
+        self.uses: Dict[Lane, int] = {}
+
+    def add(self, lane: Lane, har: str, gen: int = 0, free: bool = True) -> None:
+        self.har[lane] = (har, gen)
+        self.uses[lane] = 0
+        if free:
+            self.free.put_nowait(lane)
+
+    def forget(self, lane: Lane) -> Tuple[str, int]:
+        self.uses.pop(lane, None)
+        return self.har.pop(lane)
 
 
 class BrowserEngine:
@@ -49,6 +364,27 @@ class BrowserEngine:
         outdir: Optional[Path] = None,
         warmup_requests: int = 0,
         warmup_wait_ms: int = 500,
+        http_prefilter: bool = False,
+        http_concurrency: int = 32,
+        on_finding: Optional[Callable[[Dict[str, Any]], None]] = None,
+        storage_state_path: Optional[Path] = None,
+        concurrency: int = 1,
+        nav_timeout_ms: int = 1500,
+        trace_min_interval_s: float = 5.0,
+        trace_reflected: bool = False,
+        record_har: bool = False,
+        har_minimal: bool = False,
+        stop_on_executed: bool = True,
+        screenshot_policy: str = "viewport",  # 'none' | 'viewport' | 'full'
+        evidence_quality: int = 70,
+        browser_pool_size: int = 0,
+        browser_max_uses: int = 20,
+        exec_timeout_ms: int = 800,
+        exec_retry_ms: int = 3000,
+        recycle_every: int = 50,
+        settle_ms: int = 300,
+        block_resources: Optional[Iterable[str]] = None,
+        skip_stack_capture: bool = False,
     ):
         self.headless = headless
         self.timeout_ms = timeout_ms
@@ -59,8 +395,44 @@ class BrowserEngine:
         self.ua_mode = ua_mode or "session"
         self.trace_on_hit = trace_on_hit
         self.outdir = outdir or Path(".")
+        self._trace_dir = self.outdir / "trace"
+        # Hot-path path strings, built once (per-hit file names are plain f-strings)
+        self._evidence_str = self.evidence_dir.as_posix()
+        self._trace_str = self._trace_dir.as_posix()
+        self._outdir_str = self.outdir.as_posix()
         self.warmup_requests = warmup_requests
         self.warmup_wait_ms = warmup_wait_ms
+        self.http_prefilter = http_prefilter
+        self.http_concurrency = http_concurrency
+        self.on_finding = on_finding  # called with each finding as soon as it is final
+        # Cookies/localStorage persisted across runs (loaded if present, saved on exit)
+        self.storage_state_path = storage_state_path
+        self.concurrency = concurrency  # browser contexts probed in parallel per fuzz phase
+        self.nav_timeout_ms = nav_timeout_ms  # per-probe navigation budget (see _goto_probe)
+        # Trace export throttling: at most one stop/start cycle per context per interval,
+        # and (by default) only for executed hits — bare reflections are mostly noise
+        self.trace_min_interval_s = trace_min_interval_s
+        self.trace_reflected = trace_reflected
+        self.record_har = record_har  # HAR recording costs Chromium memory + disk I/O per request
+        self.har_minimal = har_minimal  # HAR without bodies/timings: request/response audit trail only
+        self.stop_on_executed = stop_on_executed  # skip remaining payloads for a field/param once one executes
+        # Evidence screenshots: viewport JPEG by default; quality <= 0 means lossless PNG.
+        # Executed hits are always captured full-page, whatever the policy.
+        self.screenshot_policy = screenshot_policy
+        self.evidence_quality = evidence_quality
+        # > 0: take Chromium from the module-level pool and hand it back on exit
+        self.browser_pool_size = browser_pool_size
+        self.browser_max_uses = browser_max_uses
+        self.exec_timeout_ms = exec_timeout_ms  # how long a probe waits for the payload to execute
+        self.exec_retry_ms = exec_retry_ms  # second, longer wait for reflected-but-not-executed probes (0 = off)
+        self.recycle_every = recycle_every  # probes per lane before its context is recycled (0 = never)
+        self.settle_ms = settle_ms  # extra wait for late (XHR-injected) reflections when nothing executed
+        # Playwright resource types aborted at the route level (e.g. image, media, font)
+        self.block_resources: FrozenSet[str] = frozenset(block_resources or ())
+        # Opt-in: no-op Playwright's per-call stack capture while this engine is open
+        # (see _patch_playwright_stack); ignored when traces are recorded
+        self.skip_stack_capture = skip_stack_capture and not trace_on_hit
+        self._stack_patched = False
 
         self._ua_pool = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124 Safari/537.36",
@@ -77,34 +449,49 @@ class BrowserEngine:
 
         self.last_csp: Optional[Dict[str, Any]] = None
         self.csp_by_origin: Dict[str, Dict[str, Any]] = {}
+        self._csp_cache: Dict[str, Dict[str, Any]] = {}  # raw policy -> parse_csp() result
+        self._cookies: List[Dict[str, Any]] = []
+        # Final storage states of closed fuzz lanes (only collected with storage_state_path)
+        self._lane_states: List[Dict[str, Any]] = []
+        # (context, marker) pairs whose init script is already registered on that context
+        self._init_script_markers: Set[Tuple[BrowserContext, str]] = set()
+        self._last_trace: Dict[BrowserContext, Tuple[float, str]] = {}  # context -> (monotonic ts, path)
 
     # ---------------------------
     # Async context management
     # ---------------------------
     async def __aenter__(self) -> "BrowserEngine":
-        self._pw = await async_playwright().start()
-        self.browser = await self._pw.chromium.launch(headless=self.headless)
-
-        # Global HAR for the session
-        if self.user_agent:
-            self.context = await self.browser.new_context(
-                user_agent=self.user_agent,
-                record_har_path=(self.outdir / "session.har").as_posix(),
-            )
-        else:
-            self.context = await self.browser.new_context(
-                record_har_path=(self.outdir / "session.har").as_posix()
-            )
-
+        # Output dirs are created once here, not per hit
+        self.evidence_dir.mkdir(parents=True, exist_ok=True)
         if self.trace_on_hit:
-            await self.context.tracing.start(screenshots=True, snapshots=True, sources=True)
+            self._trace_dir.mkdir(parents=True, exist_ok=True)
+        if self.browser_pool_size > 0:
+            self.browser = await acquire_browser(self.headless)
+        else:
+            self._pw = await async_playwright().start()
+            self.browser = await self._pw.chromium.launch(headless=self.headless)
 
-        self.page = await self.context.new_page()
-        self.page.set_default_timeout(self.timeout_ms)
+        # Global HAR for the session
+        self.context = await self._new_context("session.har")
+        self.page = await self._new_page(self.context)
+        # Patched last, so a failed __aenter__ (no __aexit__) never leaks a reference
+        if self.skip_stack_capture:
+            _patch_playwright_stack()
+            self._stack_patched = True
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
         try:
+            if self.context and self.storage_state_path:
+                # Warmup/fuzz traffic runs in the lane contexts: persist their cookies
+                # and localStorage too, not just the main context's
+                try:
+                    states = [await self.context.storage_state(), *self._lane_states]
+                    self.storage_state_path.write_text(
+                        json.dumps(_merge_storage_states(states)), encoding="utf-8"
+                    )
+                except Exception:
+                    pass
             if self.context and self.trace_on_hit:
                 # If tracing is still ongoing, stop without writing (avoid overwrite)
                 try:
@@ -114,10 +501,138 @@ class BrowserEngine:
         finally:
             if self.context:
                 await self.context.close()
-            if self.browser:
+            if self.browser and self.browser_pool_size > 0:
+                await release_browser(self.browser, self.headless, self.browser_pool_size, self.browser_max_uses)
+            elif self.browser:
                 await self.browser.close()
             if self._pw:
                 await self._pw.stop()
+            if self._stack_patched:
+                self._stack_patched = False
+                _unpatch_playwright_stack()
+
+    async def _new_context(self, har_name: str, storage_state: Optional[Dict[str, Any]] = None) -> BrowserContext:
+        """
+        Create a context sharing the same Chromium (UA, optional HAR, cookies, tracing).
+        `storage_state` (from a recycled context) wins over the persisted state file and
+        the replayed set_cookies() list.
+        """
+        assert self.browser is not None
+        kwargs: Dict[str, Any] = {}
+        if self.record_har:
+            kwargs["record_har_path"] = f"{self._outdir_str}/{har_name}"
+            if self.har_minimal:
+                kwargs["record_har_content"] = "omit"
+                kwargs["record_har_mode"] = "minimal"
+        if self.user_agent:
+            kwargs["user_agent"] = self.user_agent
+        if storage_state is not None:
+            kwargs["storage_state"] = storage_state
+        elif self.storage_state_path and self.storage_state_path.exists():
+            kwargs["storage_state"] = self.storage_state_path.as_posix()
+        context = await self.browser.new_context(**kwargs)
+        if self._cookies and storage_state is None:
+            await context.add_cookies(self._cookies)
+        if self.ua_mode == "per-request" or self.block_resources:
+            # UA rotation / asset blocking happen inside one route handler, so probes need
+            # no per-goto IPC (the route's own bookkeeping is bounded by lane recycling)
+            await context.route("**/*", self._router)
+        if self.trace_on_hit:
+            await context.tracing.start(screenshots=True, snapshots=True, sources=True)
+        return context
+
+    async def _new_page(self, context: BrowserContext) -> Page:
+        page = await context.new_page()
+        page.set_default_timeout(self.timeout_ms)
+        return page
+
+    @asynccontextmanager
+    async def _lane_pool(self, name: str) -> AsyncIterator[_LanePool]:
+        """
+        Pool of `concurrency` dedicated (context, page) lanes for one fuzz phase,
+        all sharing the same Chromium. The queue holds the free lanes, so it also
+        bounds how many probes run at once.
+        """
+        n = max(1, self.concurrency)
+        pool = _LanePool()
+        try:
+            for i in range(n):
+                har = f"session_{name}" if n == 1 else f"session_{name}_{i}"
+                context = await self._new_context(f"{har}.har")
+                pool.add((context, await self._new_page(context)), har)
+            yield pool
+        finally:
+            for lane in list(pool.har):
+                if self.storage_state_path:
+                    try:
+                        self._lane_states.append(await lane[0].storage_state())
+                    except Exception:
+                        pass
+                await self._close_lane(lane)
+
+    async def _close_lane(self, lane: Lane) -> None:
+        context, page = lane
+        self._init_script_markers = {k for k in self._init_script_markers if k[0] is not context}
+        self._last_trace.pop(context, None)
+        if self.trace_on_hit:
+            try:
+                await context.tracing.stop()
+            except Exception:
+                pass
+        await context.close()
+
+    async def _recycle_lane(self, pool: _LanePool, lane: Lane) -> Lane:
+        """
+        Swap a lane's context for a fresh one carrying the same cookies/localStorage.
+        Playwright only frees per-context bookkeeping (routes, requests, responses)
+        when the context closes, so long runs would otherwise keep growing.
+        Any failure before the replacement exists leaves the old lane (and its pool
+        bookkeeping) untouched, so the caller can keep using it.
+        """
+        har, gen = pool.har[lane]
+        state = await lane[0].storage_state()
+        context = await self._new_context(f"{har}_r{gen + 1}.har", storage_state=state)
+        try:
+            new_lane = (context, await self._new_page(context))
+        except Exception:
+            try:
+                await context.close()
+            except Exception:
+                pass
+            raise
+        # Only retire the old lane once its replacement exists
+        pool.forget(lane)
+        pool.add(new_lane, har, gen + 1, free=False)
+        try:
+            await self._close_lane(lane)
+        except Exception:
+            pass  # already swapped out; a failed close must not cost the new lane
+        return new_lane
+
+    @asynccontextmanager
+    async def _lease(
+        self, pool: _LanePool, skip: Optional[Callable[[], bool]] = None
+    ) -> AsyncIterator[Optional[Lane]]:
+        """
+        Borrow a free lane for one probe (waits while all lanes are busy).
+        `skip` is re-checked once the lane is ours (state may change while waiting):
+        if true, the lane goes straight back, no use is counted, and None is yielded.
+        """
+        lane = await pool.free.get()
+        if skip is not None and skip():
+            pool.free.put_nowait(lane)
+            yield None
+            return
+        try:
+            yield lane
+        finally:
+            pool.uses[lane] += 1
+            if self.recycle_every > 0 and pool.uses[lane] >= self.recycle_every:
+                try:
+                    lane = await self._recycle_lane(pool, lane)
+                except Exception:
+                    pass  # keep using the old lane rather than losing a slot
+            pool.free.put_nowait(lane)
 
     # ---------------------------
     # Helpers
@@ -131,35 +646,52 @@ class BrowserEngine:
         if delay > 0:
             await asyncio.sleep(delay / 1000.0)
 
-    async def _maybe_rotate_ua(self) -> None:
-        """Rotate UA per request if ua_mode == 'per-request'."""
-        if self.ua_mode == "per-request" and self.context:
-            ua = random.choice(self._ua_pool)
-            await self.context.set_extra_http_headers({"User-Agent": ua})
+    def _ua_headers(self) -> Optional[Dict[str, str]]:
+        """Fresh random UA header for one request (None outside 'per-request' mode)."""
+        if self.ua_mode != "per-request":
+            return None
+        return {"user-agent": random.choice(self._ua_pool)}
 
-    async def _export_trace(self, tag: str) -> Optional[str]:
-        """Export a Playwright trace when trace_on_hit is enabled, then restart tracing."""
-        if not self.trace_on_hit or not self.context:
+    async def _router(self, route: Route) -> None:
+        """Route handler: drop blocked resource types, rotate the UA (ua_mode == 'per-request')."""
+        if route.request.resource_type in self.block_resources:
+            await route.abort()
+            return
+        headers = self._ua_headers()
+        if headers:
+            await route.continue_(headers={**route.request.headers, **headers})
+        else:
+            await route.continue_()
+
+    async def _export_trace(self, context: BrowserContext, tag: str) -> Optional[str]:
+        """
+        Export a Playwright trace when trace_on_hit is enabled, then restart tracing.
+        Within trace_min_interval_s of the previous export on the same context, the
+        previous path is returned instead of cycling tracing again.
+        """
+        if not self.trace_on_hit:
             return None
-        trace_dir = self.outdir / "trace"
-        trace_dir.mkdir(parents=True, exist_ok=True)
-        path = trace_dir / f"trace_{tag}.zip"
+        last = self._last_trace.get(context)
+        if last and time.monotonic() - last[0] < self.trace_min_interval_s:
+            return last[1]
+        path = f"{self._trace_str}/trace_{tag}.zip"
         try:
-            await self.context.tracing.stop(path=path.as_posix())
+            await context.tracing.stop(path=path)
             # Restart tracing so subsequent steps continue capturing
-            await self.context.tracing.start(screenshots=True, snapshots=True, sources=True)
-            return path.as_posix()
+            await context.tracing.start(screenshots=True, snapshots=True, sources=True)
+            self._last_trace[context] = (time.monotonic(), path)
+            return path
         except Exception:
             return None
 
-    async def warmup(self, url: str) -> None:
+    async def warmup(self, url: str, page: Optional[Page] = None) -> None:
         """Perform a few gentle navigations to 'warm-up' WAF/CDN before fuzzing."""
-        if self.warmup_requests <= 0 or not self.page:
+        page = page or self.page
+        if self.warmup_requests <= 0 or not page:
             return
         for _ in range(self.warmup_requests):
             try:
-                await self._maybe_rotate_ua()
-                await self.page.goto(url, wait_until="domcontentloaded")
+                await page.goto(url, wait_until="domcontentloaded")
                 await asyncio.sleep(max(0, self.warmup_wait_ms) / 1000.0)
             except Exception:
                 # Warmup is best-effort
@@ -167,6 +699,7 @@ class BrowserEngine:
 
     async def set_cookies(self, cookies: List[Dict[str, Any]], url: str) -> None:
         """Load cookies into the context for the given URL's domain."""
+        self._cookies.extend(cookies)
         if not self.context:
             return
         await self.context.add_cookies(cookies)
@@ -178,29 +711,24 @@ class BrowserEngine:
     # ---------------------------
     # CSP capture & navigation
     # ---------------------------
-    async def _capture_csp_from_meta(self) -> Optional[str]:
+    async def _capture_origin_and_meta_csp(self, page: Page) -> Tuple[Optional[str], Optional[str]]:
         """
-        Try to read <meta http-equiv="content-security-policy" content="..."> safely.
-        Use a triple-quoted JS function string to avoid Python escaping issues.
+        Read location.origin and <meta http-equiv="content-security-policy" content="...">
+        in a single evaluate. Returns (origin, meta_csp); (None, None) on failure.
         """
-        assert self.page is not None
         try:
-            content = await self.page.evaluate(
-                """() => {
-                    const m = document.querySelector('meta[http-equiv="content-security-policy"]');
-                    return m ? m.getAttribute('content') : null;
-                }"""
-            )
-            return content
+            info = await page.evaluate(_ORIGIN_META_CSP_JS)
+            return info["origin"], info["csp"]
         except Exception:
-            return None
+            return None, None
 
-    async def navigate(self, url: str) -> Optional[Response]:
+    async def navigate(self, url: str, page: Optional[Page] = None) -> Optional[Response]:
         """Navigate to a URL, capture CSP (header + meta), store per-origin CSP, and run warmup."""
-        if not self.page:
+        page = page or self.page
+        if not page:
             raise RuntimeError("Page not initialized")
 
-        resp = await self.page.goto(url, wait_until="domcontentloaded")
+        resp = await page.goto(url, wait_until="domcontentloaded")
 
         # Header CSP
         hdr = None
@@ -211,71 +739,294 @@ class BrowserEngine:
         except Exception:
             hdr = None
 
-        # Meta CSP (safe triple-quoted JS)
-        meta_csp = await self._capture_csp_from_meta()
+        # Meta CSP + origin (one round-trip)
+        origin, meta_csp = await self._capture_origin_and_meta_csp(page)
 
         # Combine header/meta (prefer header; meta as fallback)
-        raw_csp = hdr or meta_csp
-        if raw_csp:
-            self.last_csp = parse_csp(raw_csp)
-        else:
-            self.last_csp = None
-
-        # Persist CSP by origin
-        try:
-            origin = await self.page.evaluate("() => location.origin")
-            if origin:
-                self.csp_by_origin[origin] = self.last_csp or {}
-        except Exception:
-            pass
+        self._store_csp(hdr or meta_csp, origin)
 
         # Optional warmup loop
-        await self.warmup(url)
+        await self.warmup(url, page)
         return resp
 
+    async def fetch_csp(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Capture CSP over plain HTTP (no render): header first, raw <meta> as fallback.
+        Much cheaper than navigate() when only the policy is needed.
+        """
+        assert self.context is not None
+        resp = await self.context.request.get(url, headers=self._ua_headers())
+        try:
+            hdr = resp.headers.get("content-security-policy")
+            meta_csp = None if hdr else extract_meta_csp(await resp.text())
+        finally:
+            await resp.dispose()
+        parsed = urlparse(resp.url)
+        self._store_csp(hdr or meta_csp, f"{parsed.scheme}://{parsed.netloc}")
+        return self.last_csp
+
+    def _store_csp(self, raw_csp: Optional[str], origin: Optional[str]) -> None:
+        # One parsed dict per distinct policy string; it is shared (read-only) by every hit["csp"]
+        if raw_csp:
+            parsed = self._csp_cache.get(raw_csp)
+            if parsed is None:
+                parsed = self._csp_cache[raw_csp] = parse_csp(raw_csp)
+        else:
+            parsed = None
+        self.last_csp = parsed
+        if origin:
+            self.csp_by_origin[origin] = self.last_csp or {}
+
     # ---------------------------
     # Fuzzing primitives
     # ---------------------------
-    async def _check_signals(self, marker: str) -> Tuple[bool, bool]:
+    async def _http_probe(
+        self,
+        context: BrowserContext,
+        url: str,
+        marker: str,
+        sem: asyncio.Semaphore,
+    ) -> Optional[Tuple[bool, int]]:
+        """Plain HTTP GET (no render). Return (marker reflected in body, status) or None on error."""
+        async with sem:
+            try:
+                resp = await context.request.get(url, headers=self._ua_headers())
+                try:
+                    return (marker in await resp.text()), resp.status
+                finally:
+                    await resp.dispose()
+            except Exception:
+                return None
+
+    async def _ensure_init_script(self, page: Page, marker: str) -> None:
         """
-        Return (executed, reflected).
-        executed: wait_for_execution_signal(marker) returns True within timeout.
-        reflected: marker appears in DOM HTML snapshot.
+        Register the exec-signal + sink-hook init script once per (context, marker).
+        Init scripts re-run on every new document, so re-adding them per probe would
+        only stack duplicates (and re-send the script over IPC each time).
+        """
+        key = (page.context, marker)
+        if key in self._init_script_markers:
+            return
+        await inject_init_script(page.context, marker)
+        self._init_script_markers.add(key)
+
+    async def _goto_probe(self, page: Page, url: str) -> None:
+        """
+        Navigate for a probe without waiting for the load to finish: the signal
+        polling that follows has its own timeout, and the MutationObserver fires as
+        soon as the payload lands in the DOM.
+        A commit that misses nav_timeout_ms (slow target) is retried once with the
+        full timeout_ms; only if that fails too does it raise, so the probe is
+        recorded as an error instead of being judged on the previous document.
         """
-        executed = await wait_for_execution_signal(self.page, marker, timeout_ms=self.timeout_ms)
         try:
-            html = await self.page.content()
-            reflected = (marker in html)
+            await page.goto(url, wait_until="commit", timeout=self.nav_timeout_ms)
+            return
+        except PlaywrightTimeoutError:
+            pass
+        budget = max(self.timeout_ms, self.nav_timeout_ms)
+        try:
+            await page.goto(url, wait_until="commit", timeout=budget)
+        except PlaywrightTimeoutError as e:
+            # The old document (and any exec flag/marker left on it) is still loaded
+            raise RuntimeError(f"probe navigation not committed within {budget} ms") from e
+
+    async def _check_signals(
+        self, page: Page, marker: str
+    ) -> Tuple[bool, bool, Optional[Dict[str, Any]]]:
+        """
+        Return (executed, reflected, state).
+        executed: the payload's JS ran (init-script exec event) within exec_timeout_ms;
+        raced in-page, so it returns as soon as the event fires. Probes that reflect
+        but did not execute get one more wait of exec_retry_ms (slow/deferred payloads);
+        negatives, the common case, only pay the short one.
+        reflected: marker appears in the serialized DOM (searched in-page, so only a
+        small snippet crosses IPC; page.content() is the fallback). When nothing executed,
+        the page gets settle_ms more before the check, for content injected late.
+        state: the reflection snippet + sink log read in that same evaluate, for
+        _record_evidence (None when it has to query the page itself).
+        """
+        executed = await wait_for_execution_signal(page, marker, timeout_ms=self.exec_timeout_ms)
+        if not executed and self.settle_ms > 0:
+            await asyncio.sleep(self.settle_ms / 1000.0)
+        state: Optional[Dict[str, Any]] = None
+        try:
+            state = await page.evaluate(_PROBE_STATE_JS, marker)
+            reflected = state["reflection"] is not None
         except Exception:
-            reflected = False
-        return executed, reflected
+            try:
+                html = await page.content()
+                reflected = (marker in html)
+            except Exception:
+                reflected = False
+        if reflected and not executed and self.exec_retry_ms > 0:
+            executed = await wait_for_execution_signal(page, marker, timeout_ms=self.exec_retry_ms)
+            state = None  # sinks may have moved during the longer wait: re-read them
+        return executed, reflected, state
 
-    async def _record_evidence(self, hit: Dict[str, Any], tag: str) -> None:
-        """Screenshot + sinks + trace (when executed/reflected)."""
-        assert self.page is not None
+    def _emit(self, results: List[Dict[str, Any]], hit: Dict[str, Any]) -> None:
+        """Collect a finding and stream it to on_finding (if set)."""
+        results.append(hit)
+        if self.on_finding:
+            self.on_finding(hit)
 
+    async def _record_evidence(
+        self,
+        page: Page,
+        hit: Dict[str, Any],
+        tag: str,
+        marker: str,
+        state: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Screenshot (per screenshot_policy; executed hits always full-page) + sinks +
+        trace (when executed, or reflected with trace_reflected). With policy 'none',
+        reflected hits get a small HTML snippet around the marker instead.
+        `state` (from _check_signals) saves the snippet/sink-log round-trips.
+        """
         # Screenshot
-        self.evidence_dir.mkdir(parents=True, exist_ok=True)
-        png = self.evidence_dir / f"hit_{tag}.png"
-        try:
-            await self.page.screenshot(path=png.as_posix(), full_page=True)
-            hit["screenshot"] = png.as_posix()
-        except Exception:
-            pass
+        executed = bool(hit.get("executed"))
+        if executed or self.screenshot_policy != "none":
+            if self.evidence_quality > 0:
+                shot = f"{self._evidence_str}/hit_{tag}.jpg"
+                opts: Dict[str, Any] = {"type": "jpeg", "quality": min(self.evidence_quality, 100)}
+            else:
+                shot = f"{self._evidence_str}/hit_{tag}.png"
+                opts = {"type": "png"}
+            full_page = executed or self.screenshot_policy == "full"
+            try:
+                await page.screenshot(path=shot, full_page=full_page, **opts)
+                hit["screenshot"] = shot
+            except Exception:
+                pass
+        elif hit.get("reflected"):
+            try:
+                hit["reflection"] = (
+                    state["reflection"] if state is not None
+                    else await page.evaluate(_REFLECTION_SNIPPET_JS, marker)
+                )
+            except Exception:
+                pass
 
         # Sinks log
-        try:
-            hit["sinks"] = await get_sink_log(self.page)
-        except Exception:
-            hit["sinks"] = []
+        if state is not None:
+            hit["sinks"] = state["sinks"]
+        else:
+            try:
+                hit["sinks"] = await get_sink_log(page)
+            except Exception:
+                hit["sinks"] = []
 
         # Trace ZIP
-        if hit.get("executed") or hit.get("reflected"):
-            hit["trace"] = await self._export_trace(tag)
+        if hit.get("executed") or (self.trace_reflected and hit.get("reflected")):
+            hit["trace"] = await self._export_trace(page.context, tag)
 
     # ---------------------------
     # Form fuzzing
     # ---------------------------
+    async def _snapshot_forms(self, page: Page, max_forms: int) -> List[Dict[str, Any]]:
+        """Return [{"idx", "action", "fields": [named input/textarea names]}] in one round-trip."""
+        try:
+            forms = await page.evaluate(_FORMS_SNAPSHOT_JS)
+        except Exception:
+            return []
+        forms = forms[: max_forms if max_forms > 0 else len(forms)]
+        return [f for f in forms if f["fields"]]
+
+    async def _form_reusable(
+        self, page: Page, url: str, fidx: int, action: str, fields: List[str], marker: str
+    ) -> bool:
+        """True if `page` can be filled again without re-navigating to `url` (one short evaluate)."""
+        if page.url != url:
+            return False
+        try:
+            return bool(await page.evaluate(_FORM_REUSABLE_JS, [fidx, marker, action, fields]))
+        except Exception:
+            return False
+
+    async def _probe_form(
+        self,
+        lanes: _LanePool,
+        url: str,
+        marker: str,
+        fidx: int,
+        action: str,
+        fields: List[str],
+        name: str,
+        p: str,
+        done: Set[Tuple[int, str]],
+    ) -> List[Dict[str, Any]]:
+        """
+        One rendered (form, field, payload) probe on a free lane: reload, fill, submit, check.
+        The reload is skipped when the lane is still on `url` with a clean copy of the form.
+        `done` holds the (form, field) pairs that already executed (see stop_on_executed);
+        those probes are skipped before leasing, or on lease without counting a lane use.
+        """
+        out: List[Dict[str, Any]] = []
+        key = (fidx, name)
+        if key in done:
+            return out
+        async with self._lease(lanes, skip=lambda: key in done) as lane:
+            if lane is None:
+                return out
+            context, page = lane
+            try:
+                # Ensure init script is injected for execution detection and sink hooks
+                await self._ensure_init_script(page, marker)
+                if not await self._form_reusable(page, url, fidx, action, fields, marker):
+                    await page.goto(url, wait_until="domcontentloaded")
+
+                # Fill every named field with benign data; target field with the payload
+                values = {nm: (p if nm == name else f"test-{marker}") for nm in fields}
+
+                # Fill + submit in one evaluate; fallback to pressing Enter if needed
+                try:
+                    await page.evaluate(_FILL_SUBMIT_JS, {"idx": fidx, "values": values})
+                except Exception:
+                    try:
+                        await page.locator("form").nth(fidx).press("Enter")
+                    except Exception:
+                        pass
+
+                # Give the submit navigation a short head start; signal polling covers the rest
+                try:
+                    await page.wait_for_load_state("domcontentloaded", timeout=self.nav_timeout_ms)
+                except Exception:
+                    pass
+
+                executed, reflected, state = await self._check_signals(page, marker)
+
+                hit = {
+                    "mode": "form",
+                    "field": name,
+                    "payload": p,
+                    "executed": executed,
+                    "reflected": reflected,
+                    "url": page.url,
+                    "csp": self.last_csp,
+                }
+
+                tag = f"form_{fidx}_{name}_{_tag(p)}"
+                await self._record_evidence(page, hit, tag, marker, state)
+                self._emit(out, hit)
+                if executed and self.stop_on_executed:
+                    done.add((fidx, name))
+
+                await self._paced_sleep()
+            except Exception as e:
+                self._emit(
+                    out,
+                    {
+                        "mode": "form",
+                        "field": name,
+                        "payload": p,
+                        "error": str(e),
+                        "url": page.url,
+                        "csp": self.last_csp,
+                    }
+                )
+        return out
+
     async def fuzz_forms(
         self,
         url: str,
@@ -285,90 +1036,100 @@ class BrowserEngine:
     ) -> List[Dict[str, Any]]:
         """
         Fill and submit named inputs in <form> elements.
-        - Inject init script before each submission (ensures MutationObserver + hooks).
+        - Every (form, field, payload) probe runs on a free lane, up to `concurrency`
+          at a time. It reloads the form unless the lane still holds a clean,
+          instrumented copy of it (see _form_reusable).
+        - The init script (exec signal, sink hooks, fill helper) is registered on the
+          lane before the form is first loaded, so even that copy is instrumented.
         - After submit, check execution/reflection, capture evidence.
         """
-        results: List[Dict[str, Any]] = []
-        await self.navigate(url)
-
-        assert self.page is not None
-        forms = await self.page.query_selector_all("form")
-        for fidx, form in enumerate(forms[: max_forms if max_forms > 0 else len(forms)]):
-            # Pick all named inputs inside this form
-            inputs = await form.query_selector_all("input[name], textarea[name]")
-            names = []
-            for el in inputs:
-                try:
-                    nm = await el.get_attribute("name")
-                    if nm:
-                        names.append(nm)
-                except Exception:
-                    pass
-            if not names:
-                continue
+        payloads = _unique_by_tag(payloads)
+        done: Set[Tuple[int, str]] = set()
+        async with self._lane_pool("forms") as lanes:
+            async with self._lease(lanes) as (_, page):
+                await self._ensure_init_script(page, marker)
+                await self.navigate(url, page)
+                specs = await self._snapshot_forms(page, max_forms)
 
-            for name in names:
-                for p in payloads:
-                    try:
-                        await self._maybe_rotate_ua()
-                        # Ensure init script is injected for execution detection and sink hooks
-                        await inject_init_script(self.page, marker)
-
-                        # Fill every named field with benign data; target field with the payload
-                        for el in inputs:
-                            nm = await el.get_attribute("name")
-                            if not nm:
-                                continue
-                            val = p if nm == name else f"test-{marker}"
-                            try:
-                                await el.fill(val)
-                            except Exception:
-                                pass
-
-                        # Submit the form (try submit(); fallback to pressing Enter if needed)
-                        try:
-                            await form.evaluate("(f)=>f.submit()")
-                        except Exception:
-                            try:
-                                await form.press("Enter")
-                            except Exception:
-                                pass
-
-                        # Wait for DOMContentLoaded or network idle to stabilize page
-                        try:
-                            await self.page.wait_for_load_state("domcontentloaded", timeout=self.timeout_ms)
-                        except Exception:
-                            pass
-
-                        executed, reflected = await self._check_signals(marker)
-
-                        hit = {
-                            "mode": "form",
-                            "field": name,
-                            "payload": p,
-                            "executed": executed,
-                            "reflected": reflected,
-                            "url": self.page.url,
-                            "csp": self.last_csp,
-                        }
-
-                        tag = f"form_{fidx}_{name}_{abs(hash(p)) % (10**8)}"
-                        await self._record_evidence(hit, tag)
-                        results.append(hit)
+            batches = await _run_all(
+                *(
+                    self._probe_form(lanes, url, marker, f["idx"], f["action"], f["fields"], name, p, done)
+                    for f in specs for name in f["fields"] for p in payloads
+                )
+            )
+        return [hit for batch in batches for hit in batch]
 
-                        await self._paced_sleep()
-                    except Exception as e:
-                        results.append(
-                            {
-                                "mode": "form",
-                                "field": name,
-                                "payload": p,
-                                "error": str(e),
-                                "url": self.page.url if self.page else url,
-                                "csp": self.last_csp,
-                            }
-                        )
-        return results
+    async def _fetch_form(
+        self,
+        page: Page,
+        sem: asyncio.Semaphore,
+        fidx: int,
+        values: Dict[str, str],
+    ) -> Optional[Dict[str, Any]]:
+        """Submit a form via in-page fetch (no navigation). Return {"status", "text"} or None on error."""
+        async with sem:
+            try:
+                return await page.evaluate(_FETCH_SUBMIT_JS, {"idx": fidx, "values": values})
+            except Exception:
+                return None
+
+    async def fuzz_forms_fast(
+        self,
+        url: str,
+        marker: str,
+        payloads: List[str],
+        max_forms: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """
+        Like fuzz_forms(), but every submission is first sent with an in-page fetch()
+        from a single loaded copy of the page (no navigation, no rendering).
+        - Only responses that echo the payload verbatim (or fetches that fail) get the
+          full rendered probe with execution detection and evidence.
+        - The rest are recorded as prefiltered, with `reflected` meaning "marker echoed".
+        """
+        payloads = _unique_by_tag(payloads)
+        done: Set[Tuple[int, str]] = set()
+        async with self._lane_pool("forms") as lanes:
+            async with self._lease(lanes) as (_, page):
+                await self.navigate(url, page)
+                specs = await self._snapshot_forms(page, max_forms)
+                plan = [
+                    (f["idx"], f["action"], f["fields"], name, p)
+                    for f in specs for name in f["fields"] for p in payloads
+                ]
+                sem = asyncio.Semaphore(max(1, self.http_concurrency))
+                fetched = await _run_all(
+                    *(
+                        self._fetch_form(page, sem, fidx, {nm: (p if nm == name else f"test-{marker}") for nm in fields})
+                        for fidx, _, fields, name, p in plan
+                    )
+                )
+                action_url = page.url
+
+            async def probe(
+                fidx: int, action: str, fields: List[str], name: str, p: str, resp: Optional[Dict[str, Any]]
+            ) -> List[Dict[str, Any]]:
+                if resp is None or p in resp["text"]:
+                    return await self._probe_form(lanes, url, marker, fidx, action, fields, name, p, done)
+                out: List[Dict[str, Any]] = []
+                self._emit(
+                    out,
+                    {
+                        "mode": "form",
+                        "field": name,
+                        "payload": p,
+                        "executed": False,
+                        "reflected": marker in resp["text"],
+                        "status": resp["status"],
+                        "url": action_url,
+                        "csp": self.last_csp,
+                        "prefiltered": True,
+                    }
+                )
+                return out
+
+            batches = await _run_all(*(probe(*item, resp) for item, resp in zip(plan, fetched)))
+        return [hit for batch in batches for hit in batch]
 
     # ---------------------------
     # URL parameter fuzzing (+ fragment fallback)
@@ -384,97 +1145,161 @@ class BrowserEngine:
         """
         Fuzz URL parameters preserving existing query.
         If no hit, also try #fragment fallback and force a hashchange.
+        (param, payload) probes run on a pool of `concurrency` browser contexts.
         """
-        results: List[Dict[str, Any]] = []
+        payloads = _unique_by_tag(payloads)
+        # (param, mode) pairs that already executed (stop_on_executed): a query hit ends
+        # the param, a fragment hit only stops the fragment fallback for it
+        done: Set[Tuple[str, str]] = set()
 
-        # Parse and preserve existing query
-        parsed = urlparse(base_url)
-        orig_params = parse_qsl(parsed.query, keep_blank_values=True)
+        parsed, orig_params, param_candidates = _plan_params(base_url, max_params)
 
-        # Build a small param pool (existing + a few synthetic)
-        param_candidates = [k for (k, _) in orig_params]
-        synthetic = ["q", "query", "search", "id", "name", "title"]
-        for s in synthetic:
-            if s not in param_candidates:
-                param_candidates.append(s)
+        # Loop invariants: base query, URL without fragment, original fragment suffix
+        base_qd = dict(orig_params)
+        no_frag = parsed._replace(fragment="")
+        frag_suffix = f"#{parsed.fragment}" if parsed.fragment else ""
 
-        param_candidates = param_candidates[: max_params if max_params > 0 else len(param_candidates)]
+        def build_url(pname: str, p: str) -> str:
+            # Query preserving existing keys/values, replacing/adding pname (fragment stripped)
+            return urlunparse(no_frag._replace(query=urlencode({**base_qd, pname: p}, doseq=True)))
 
+        # Every probe URL is built exactly once, shared by the HTTP pre-pass and the probes.
+        # One urlencode per param: the payload slot is a placeholder, filled with the same
+        # quote_plus() encoding urlencode would apply (so the URLs are identical).
+        plan: List[Tuple[str, str, str]] = []
         for pname in param_candidates:
-            for p in payloads:
-                try:
-                    await self._maybe_rotate_ua()
-                    # Build query preserving existing keys/values, replacing/adding pname
-                    qdict = dict(orig_params)
-                    qdict[pname] = p
-                    new_query = urlencode(qdict, doseq=True)
-
-                    new_url = urlunparse(parsed._replace(query=new_query))
-                    await inject_init_script(self.page, marker)  # ensure hooks for each nav
-                    await self.page.goto(new_url, wait_until="domcontentloaded")
-
-                    executed, reflected = await self._check_signals(marker)
-                    status = None
+            parts = build_url(pname, _URL_SLOT).split(_URL_SLOT)
+            if len(parts) != 2:  # placeholder clash with the base URL: build each URL fully
+                plan.extend((pname, p, build_url(pname, p)) for p in payloads)
+                continue
+            head, tail = parts
+            plan.extend((pname, p, f"{head}{quote_plus(p, safe='')}{tail}") for p in payloads)
+
+        async with self._lane_pool("url") as lanes:
+            # Optional HTTP pre-pass: only URLs whose response echoes the marker get
+            # the (expensive) rendered query-param pass. Fragment fallback still runs
+            # in the browser, since fragments never reach the server.
+            # The requests are pipelined with the browser work: each probe renders as
+            # soon as its own HTTP answer is in, instead of after the whole pre-pass.
+            # They go through the main context, so no lane sits idle meanwhile.
+            http_probes: Dict[str, "asyncio.Future[Optional[Tuple[bool, int]]]"] = {}
+            if self.http_prefilter:
+                sem = asyncio.Semaphore(max(1, self.http_concurrency))
+                http_probes = {
+                    u: asyncio.ensure_future(self._http_probe(self.context, u, marker, sem))
+                    for u in dict.fromkeys(u for _, _, u in plan)
+                }
+
+            async def probe(pname: str, p: str, page_url: str) -> List[Dict[str, Any]]:
+                out: List[Dict[str, Any]] = []
+                # Awaited before leasing, so a lane is never held waiting on HTTP
+                http_future = http_probes.get(page_url)
+                http_probe = await http_future if http_future is not None else None
+                qkey, fkey = (pname, "url_param"), (pname, "url_fragment")
+                if qkey in done:
+                    return out
+                async with self._lease(lanes, skip=lambda: qkey in done) as lane:
+                    if lane is None:
+                        return out
+                    context, page = lane
+                    mode = "url_param"  # the step in flight, for the error entry
                     try:
-                        resp = await self.page.wait_for_load_state("domcontentloaded", timeout=self.timeout_ms)
-                        # Playwright doesn't expose status here; leave None
-                    except Exception:
-                        pass
+                        new_url = page_url + frag_suffix
 
-                    hit = {
-                        "mode": "url_param",
-                        "param": pname,
-                        "payload": p,
-                        "executed": executed,
-                        "reflected": reflected,
-                        "status": status,
-                        "url": self.page.url,
-                        "csp": self.last_csp,
-                    }
-                    tag = f"param_{pname}_{abs(hash(p)) % (10**8)}"
-                    await self._record_evidence(hit, tag)
-                    results.append(hit)
-
-                    # Fragment fallback (for SPAs) if not executed/reflected
-                    if not executed and not reflected:
-                        frag_val = quote(p, safe="")
-                        frag_url = new_url.split("#", 1)[0] + f"#{frag_val}"
-                        await inject_init_script(self.page, marker)
-                        await self.page.goto(frag_url, wait_until="domcontentloaded")
-                        # nudge routers that listen to hashchange
-                        try:
-                            await self.page.evaluate("() => window.dispatchEvent(new HashChangeEvent('hashchange'))")
-                        except Exception:
-                            pass
-
-                        executed2, reflected2 = await self._check_signals(marker)
-                        hit2 = {
-                            "mode": "url_fragment",
-                            "param": pname,
-                            "payload": p,
-                            "executed": executed2,
-                            "reflected": reflected2,
-                            "url": self.page.url,
-                            "csp": self.last_csp,
-                        }
-                        tag2 = f"fragment_{pname}_{abs(hash(p)) % (10**8)}"
-                        await self._record_evidence(hit2, tag2)
-                        results.append(hit2)
-
-                    # pacing + potential UA rotation between iterations
-                    await self._paced_sleep()
-                except Exception as e:
-                    results.append(
-                        {
-                            "mode": "url_param",
-                            "param": pname,
-                            "payload": p,
-                            "error": str(e),
-                            "url": self.page.url if self.page else base_url,
-                            "csp": self.last_csp,
-                        }
-                    )
-                    # crude backoff on repeated errors
-                    await asyncio.sleep(max(0, backoff_ms) / 1000.0)
+                        if http_probe is not None and not http_probe[0]:
+                            # Marker not echoed by the server: skip rendering this URL
+                            executed, reflected = False, False
+                            hit = {
+                                "mode": "url_param",
+                                "param": pname,
+                                "payload": p,
+                                "executed": False,
+                                "reflected": False,
+                                "status": http_probe[1],
+                                "url": new_url,
+                                "csp": self.last_csp,
+                                "prefiltered": True,
+                            }
+                            self._emit(out, hit)
+                        else:
+                            await self._ensure_init_script(page, marker)  # no-op after the first nav
+                            await self._goto_probe(page, new_url)
+
+                            executed, reflected, state = await self._check_signals(page, marker)
+                            # Only the HTTP pre-pass knows the status; the page load does not expose it here
+                            status = http_probe[1] if http_probe is not None else None
+
+                            hit = {
+                                "mode": "url_param",
+                                "param": pname,
+                                "payload": p,
+                                "executed": executed,
+                                "reflected": reflected,
+                                "status": status,
+                                "url": page.url,
+                                "csp": self.last_csp,
+                            }
+                            tag = f"param_{pname}_{_tag(p)}"
+                            await self._record_evidence(page, hit, tag, marker, state)
+                            self._emit(out, hit)
 
-        return results
+                        if executed and self.stop_on_executed:
+                            done.add(qkey)
+
+                        # Fragment fallback (for SPAs) if not executed/reflected
+                        if not executed and not reflected and fkey not in done:
+                            mode = "url_fragment"
+                            frag = f"#{quote(p, safe='')}"
+                            if page.url.split("#", 1)[0] == page_url:
+                                # Shell already loaded on this lane: a hash assignment is enough for
+                                # client-side routers (init scripts persist if it causes a reload)
+                                await page.evaluate(_SET_HASH_JS, frag)
+                            else:
+                                await self._ensure_init_script(page, marker)
+                                await self._goto_probe(page, page_url + frag)
+                                # nudge routers that listen to hashchange
+                                try:
+                                    await page.evaluate(_HASHCHANGE_JS)
+                                except Exception:
+                                    pass
+
+                            executed2, reflected2, state2 = await self._check_signals(page, marker)
+                            hit2 = {
+                                "mode": "url_fragment",
+                                "param": pname,
+                                "payload": p,
+                                "executed": executed2,
+                                "reflected": reflected2,
+                                "url": page.url,
+                                "csp": self.last_csp,
+                            }
+                            tag2 = f"fragment_{pname}_{_tag(p)}"
+                            await self._record_evidence(page, hit2, tag2, marker, state2)
+                            self._emit(out, hit2)
+                            if executed2 and self.stop_on_executed:
+                                done.add(fkey)
+
+                        # pacing between iterations (UA rotation, if any, happens in _router)
+                        await self._paced_sleep()
+                    except Exception as e:
+                        self._emit(
+                            out,
+                            {
+                                "mode": mode,
+                                "param": pname,
+                                "payload": p,
+                                "error": str(e),
+                                "url": page.url,
+                                "csp": self.last_csp,
+                            }
+                        )
+                        # crude backoff on repeated errors
+                        await asyncio.sleep(max(0, backoff_ms) / 1000.0)
+                return out
+
+            try:
+                batches = await _run_all(*(probe(pname, p, u) for pname, p, u in plan))
+            finally:
+                for fut in http_probes.values():
+                    fut.cancel()  # no-op once finished; drops leftovers if a probe blew up
+        return [hit for batch in batches for hit in batch]
@@ -1,6 +1,6 @@
 import asyncio
-from typing import Dict, Any
-from playwright.async_api import Page
+from typing import Dict, Any, Union
+from playwright.async_api import BrowserContext, Page
 
 
 HOOKS_SCRIPT = '''
@@ -65,6 +65,34 @@ HOOKS_SCRIPT = '''
 })();
 '''
 
+# Form fill + submit, defined once per document; the engine only calls it with JSON.
+# Mimics Locator.fill(): only text-like fields get a value, and input/change are fired
+# for framework-bound forms.
+FORM_HELPERS_SCRIPT = '''
+(() => {
+  try {
+    const skip = ['hidden', 'checkbox', 'radio', 'file', 'submit', 'button', 'image', 'reset'];
+    const submit = HTMLFormElement.prototype.submit;
+    Object.defineProperty(window, '__xssentinel_fill', {
+      value: (idx, values) => {
+        const f = document.forms[idx];
+        if (!f) throw new Error('form ' + idx + ' not found');
+        for (const el of f.querySelectorAll('input[name], textarea[name]')) {
+          const nm = el.getAttribute('name');
+          if (!(nm in values) || el.disabled || el.readOnly || skip.includes((el.type || '').toLowerCase())) continue;
+          el.value = values[nm];
+          el.dispatchEvent(new Event('input', {bubbles: true}));
+          el.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+        // A field named "submit" shadows f.submit: use the prototype method
+        submit.call(f);
+      },
+      configurable: true
+    });
+  } catch(e){}
+})();
+'''
+
 INIT_SCRIPT_TEMPLATE = """
 (() => {
   try {
@@ -80,7 +108,24 @@ INIT_SCRIPT_TEMPLATE = """
       } catch(e){}
     });
     obs.observe(document.documentElement || document, {subtree:true, childList:true, attributes:true, characterData:true});
-    // Sinal periódico caso o JS da página reescreva o título
+    // Real execution: payloads run document.title='xss:'+marker (JSCMD_FMT in the mutator)
+    try {
+      const execSig = 'xss:' + marker;
+      const signalExec = () => {
+        for (const w of [window, window.top]) {
+          try { w.__xssentinel_exec = true; w.dispatchEvent(new Event('__xss_exec_' + marker)); } catch(e){}
+        }
+      };
+      const td = Object.getOwnPropertyDescriptor(Document.prototype, 'title');
+      if (td && td.set) {
+        Object.defineProperty(Document.prototype, 'title', {
+          set: function(v){ if (String(v).indexOf(execSig) !== -1) signalExec(); return td.set.call(this, v); },
+          get: td.get,
+          configurable: true
+        });
+      }
+    } catch(e){}
+    // Periodic signal in case the page's JS rewrites the title
     setInterval(() => {
       if ((window.__xssentinel_hits||[]).includes(marker)) {
         try { if (!document.title.includes('xssentinel-hit-'+marker)) document.title = 'xssentinel-hit-' + marker; } catch(e){}
@@ -90,18 +135,41 @@ INIT_SCRIPT_TEMPLATE = """
 })();
 """;
 
+EXEC_RACE_SCRIPT = """
+([m, t]) => {
+  if (window.__xssentinel_exec) return true;
+  return new Promise(resolve => {
+    const ev = '__xss_exec_' + m;
+    const done = v => { clearTimeout(timer); window.removeEventListener(ev, onExec); resolve(v); };
+    const onExec = () => done(true);
+    window.addEventListener(ev, onExec);
+    const timer = setTimeout(() => done(false), t);
+  });
+}
+"""
+
 async def wait_for_execution_signal(page: Page, marker: str, timeout_ms: int = 4000) -> bool:
-    # Verifica se document.title sinalizou execução
-    try:
-        await page.wait_for_function("document.title.includes('xssentinel-hit-' + marker)", timeout=timeout_ms)
-        return True
-    except Exception:
-        return False
+    # Races the init script's exec event against the timeout in-page (one round-trip).
+    # If a navigation destroys the context mid-wait, retries on the new document until the deadline.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0, timeout_ms) / 1000.0
+    while True:
+        remaining_ms = int((deadline - loop.time()) * 1000)
+        try:
+            return bool(await page.evaluate(EXEC_RACE_SCRIPT, [marker, max(0, remaining_ms)]))
+        except Exception:
+            if remaining_ms <= 0:
+                return False
+            await asyncio.sleep(0.05)
+
+def build_init_script(marker: str) -> str:
+    # Exec signal + sink hooks + form helper as one script (a single add_init_script)
+    return (INIT_SCRIPT_TEMPLATE.replace('%MARKER%', marker.replace("'","\\'"))
+            + ";\n" + HOOKS_SCRIPT + ";\n" + FORM_HELPERS_SCRIPT)
 
-async def inject_init_script(page: Page, marker: str):
-    script = INIT_SCRIPT_TEMPLATE.replace('%MARKER%', marker.replace("'","\\'"))
-    await page.add_init_script(script)
-    await page.add_init_script(HOOKS_SCRIPT)
+async def inject_init_script(target: Union[Page, BrowserContext], marker: str):
+    # Page or BrowserContext (on a context it applies to all future pages/frames)
+    await target.add_init_script(build_init_script(marker))
 
 
 async def get_sink_log(page: Page):
@@ -20,27 +20,29 @@ KEYWORDS = [
     "onclick", "onmouseenter", "onmouseleave", "alert", "prompt", "confirm",
     "javascript", "srcdoc"
 ]
+_KEYWORD_RX = re.compile(r"(?i)(" + "|".join(re.escape(k) for k in KEYWORDS) + r")")
 
 def case_shuffle(s: str, p: float = 0.45) -> str:
     """Randomly toggle case of letters (keeps digits/symbols)."""
-    out = []
-    for ch in s:
-        if ch.isalpha() and random.random() < p:
-            out.append(ch.upper() if ch.islower() else ch.lower())
-        else:
-            out.append(ch)
-    return "".join(out)
+    rnd = random.random  # one draw per letter, same order as a plain loop (seed-stable)
+    return "".join(
+        (ch.upper() if ch.islower() else ch.lower()) if ch.isalpha() and rnd() < p else ch
+        for ch in s
+    )
 
 def insert_zero_width(s: str, density: float = 0.20) -> str:
     """Insert zero-width chars between alphanumerics with given probability."""
     if not s:
         return s
+    rnd, choice = random.random, random.choice
     out = [s[0]]
-    for i in range(1, len(s)):
-        prev, cur = s[i - 1], s[i]
-        if prev.isalnum() and cur.isalnum() and random.random() < density:
-            out.append(random.choice(ZERO_WIDTH))
+    prev_alnum = s[0].isalnum()
+    for cur in s[1:]:
+        cur_alnum = cur.isalnum()
+        if prev_alnum and cur_alnum and rnd() < density:
+            out.append(choice(ZERO_WIDTH))
         out.append(cur)
+        prev_alnum = cur_alnum
     return "".join(out)
 
 def html_comment_noise(s: str, every: int = 5) -> str:
@@ -53,37 +55,41 @@ def html_comment_noise(s: str, every: int = 5) -> str:
     chunks = [s[i : i + every] for i in range(0, len(s), every)]
     return "<!--x-->" + "<!--x-->".join(chunks)
 
+_ENTITY_OPTIONS = {
+    "<": ("&lt;", "&#60;", "&#x3c;"),
+    ">": ("&gt;", "&#62;", "&#x3e;"),
+    '"': ("&quot;", "&#34;", "&#x22;"),
+    "'": ("&#39;", "&#x27;"),
+    "/": ("&#47;", "&#x2f;"),
+    "=": ("&#61;", "&#x3d;"),
+    "(": ("&#40;", "&#x28;"),
+    ")": ("&#41;", "&#x29;"),
+}
+
 def html_entity_mangle(s: str) -> str:
     """Mix of named/decimal/hex entities for common meta-chars."""
-    table = {
-        "<": ["&lt;", "&#60;", "&#x3c;"],
-        ">": ["&gt;", "&#62;", "&#x3e;"],
-        '"': ["&quot;", "&#34;", "&#x22;"],
-        "'": ["&#39;", "&#x27;"],
-        "/": ["&#47;", "&#x2f;"],
-        "=": ["&#61;", "&#x3d;"],
-        "(": ["&#40;", "&#x28;"],
-        ")": ["&#41;", "&#x29;"],
-    }
-    out = []
-    for ch in s:
-        if ch in table:
-            out.append(random.choice(table[ch]))
-        else:
-            out.append(ch)
-    return "".join(out)
+    if _ENTITY_OPTIONS.keys().isdisjoint(s):
+        return s  # nothing to mangle (and no random draws, as before)
+    choice, opts = random.choice, _ENTITY_OPTIONS
+    return "".join(choice(opts[ch]) if ch in opts else ch for ch in s)
+
+class _UrlMangleTable(dict):
+    """str.translate table for url_mangle, filled lazily (covers any code point)."""
+
+    def __missing__(self, o: int) -> str:
+        c = chr(o)
+        v = c if c.isalnum() or c in "-._~" else "%%%02X" % o
+        self[o] = v
+        return v
+
+_URL_TABLE = _UrlMangleTable()
 
 def url_mangle(s: str) -> str:
     """
     Light percent-encoding for selected bytes while keeping punctuation recognizable.
     Avoids double-encoding. Safe for query/fragment contexts.
     """
-    def _enc(c: str) -> str:
-        o = ord(c)
-        if c.isalnum() or c in "-._~":
-            return c
-        return "%%%02X" % o
-    return "".join(_enc(c) for c in s)
+    return s.translate(_URL_TABLE)
 
 def keyword_split(s: str) -> str:
     """
@@ -106,8 +112,7 @@ def keyword_split(s: str) -> str:
                 out.append(ch)
         return "".join(out)
 
-    rx = re.compile(r"(?i)(" + "|".join(re.escape(k) for k in KEYWORDS) + r")")
-    return rx.sub(repl, s)
+    return _KEYWORD_RX.sub(repl, s)
 
 def _js_quote(s: str) -> str:
     """
@@ -146,13 +151,7 @@ def apply_all(payload: str) -> List[str]:
         variants.extend(delayed_exec_wrappers(payload))
 
     # de-dup preserving order
-    seen = set()
-    uniq: List[str] = []
-    for v in variants:
-        if v not in seen:
-            uniq.append(v)
-            seen.add(v)
-    return uniq
+    return list(dict.fromkeys(variants))
 
 # Compatibility exports (some versions import these names)
 def compose_evasions(js: str) -> List[str]:
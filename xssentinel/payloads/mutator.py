@@ -11,8 +11,10 @@ from __future__ import annotations
 
 import os
 import random
-from typing import Dict, Iterable, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from ..utils.csp import parse_csp
 from .evasions import apply_all as ev_apply
 
 
@@ -36,41 +38,55 @@ BASE_TEMPLATES: List[str] = [
 JSCMD_FMT = "document.title='xss:'+{MARKER!r}"
 
 
+@lru_cache(maxsize=64)
+def _load_one(path: str, mtime: float) -> Tuple[str, ...]:
+    """Payload lines of one wordlist; keyed by mtime so an edited file is re-read."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        stripped = (line.strip() for line in f)
+        return tuple(line for line in stripped if line and not line.startswith("#"))
+
+
 def _load_external(paths: Iterable[str]) -> List[str]:
     out: List[str] = []
     for p in paths:
         if not p:
             continue
         try:
-            with open(p, "r", encoding="utf-8", errors="ignore") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                    out.append(line)
+            out.extend(_load_one(p, os.path.getmtime(p)))
         except Exception:
             continue
     # de-dup preserving order
-    seen = set()
-    uniq: List[str] = []
-    for v in out:
-        if v not in seen:
-            uniq.append(v); seen.add(v)
-    return uniq
+    return list(dict.fromkeys(out))
+
+
+CspFlags = Tuple[bool, bool, bool]  # (allows_inline, allows_data, allows_blob)
 
 
-def _csp_filter(templates: List[str], csp: Optional[Dict]) -> List[str]:
+def _csp_flags(csp: Optional[Dict]) -> Optional[CspFlags]:
+    """Reduce a CSP dict to the hashable flags the filter needs (None = no CSP)."""
+    if not csp:
+        return None
+    if "allows_inline" not in csp:
+        # Hand-built dict without parse_csp() flags: derive them from the raw header
+        csp = parse_csp(csp.get("raw"))
+    return (
+        bool(csp.get("allows_inline")),
+        bool(csp.get("allows_data")),
+        bool(csp.get("allows_blob")),
+    )
+
+
+def _csp_filter(templates: List[str], flags: Optional[CspFlags]) -> List[str]:
     """
     Very light CSP filter:
     - If inline scripts likely blocked, prefer non-inline vectors.
     - If data:/blob:/srcdoc allowed, keep those templates.
     This is intentionally simple (heavy logic lives elsewhere).
+    May return an empty list; callers decide the fallback.
     """
-    if not csp:
+    if not flags:
         return templates
-    allows_inline = csp.get("allows_inline", False) or "'unsafe-inline'" in str(csp).lower()
-    allows_data = "data:" in str(csp).lower()
-    allows_blob = "blob:" in str(csp).lower()
+    allows_inline, allows_data, allows_blob = flags
 
     filtered: List[str] = []
     for t in templates:
@@ -78,7 +94,7 @@ def _csp_filter(templates: List[str], csp: Optional[Dict]) -> List[str]:
             # still keep a few in case of parser differentials
             if random.random() < 0.25:
                 filtered.append(t)
-            continue if False else None  # noqa: no-op for readability
+            continue
         if "srcdoc" in t and not (allows_inline or allows_data):
             continue
         if "data:" in t and not allows_data:
@@ -86,7 +102,34 @@ def _csp_filter(templates: List[str], csp: Optional[Dict]) -> List[str]:
         if "blob:" in t and not allows_blob:
             continue
         filtered.append(t)
-    return filtered or templates  # never return empty list
+    return filtered
+
+
+def _expand(templates: List[str], marker: str) -> List[str]:
+    """Fill placeholders, then apply evasions."""
+    payloads: List[str] = []
+    for tpl in templates:
+        filled = (
+            tpl.replace("{MARKER}", marker)
+               .replace("{JSCMD}", JSCMD_FMT.replace("{MARKER!r}", repr(marker)))
+        )
+        payloads.extend(ev_apply(filled))
+    return payloads
+
+
+@lru_cache(maxsize=16)
+def _catalog(
+    templates: Tuple[str, ...], flags: Optional[CspFlags], marker: str, seed: Optional[int]
+) -> Tuple[str, ...]:
+    """
+    CSP-filtered + expanded templates for one (template set, CSP, marker, seed);
+    memoized across calls. Seeded once, so the filter and the evasions draw one
+    sequence, exactly as an unmemoized run over the same templates would.
+    """
+    if seed is not None:
+        random.seed(seed)
+    tpls = list(templates)
+    return tuple(_expand(_csp_filter(tpls, flags) or tpls, marker))  # never an empty catalog
 
 
 async def build_payloads(
@@ -104,30 +147,17 @@ async def build_payloads(
     - Merge with external wordlists.
     - Expand via evasions.apply_all().
     - Bound by max_payloads (stable order).
+    With a seed, the whole expansion is memoized per (template set, CSP flags,
+    marker, seed).
     """
-    if seed is not None:
-        random.seed(seed)
-
+    flags = _csp_flags(csp)
     ext = _load_external(external_paths)
-    templates = ext if mode == "replace" and ext else BASE_TEMPLATES + ext
-    templates = _csp_filter(templates, csp)
+    templates = tuple(ext) if mode == "replace" and ext else tuple(BASE_TEMPLATES) + tuple(ext)
 
-    # fill placeholders, then apply evasions
-    payloads: List[str] = []
-    for tpl in templates:
-        filled = (
-            tpl.replace("{MARKER}", marker)
-               .replace("{JSCMD}", JSCMD_FMT.replace("{MARKER!r}", repr(marker)))
-        )
-        variants = ev_apply(filled)
-        payloads.extend(variants)
+    # Unseeded runs must stay random per call, so bypass the cache for them
+    catalog = _catalog if seed is not None else _catalog.__wrapped__
+    payloads = catalog(templates, flags, marker, seed)
 
     # Stable de-dup and cap
-    seen = set()
-    final: List[str] = []
-    for v in payloads:
-        if v not in seen:
-            final.append(v); seen.add(v)
-        if 0 < max_payloads <= len(final):
-            break
-    return final
+    final = list(dict.fromkeys(payloads))
+    return final[:max_payloads] if max_payloads > 0 else final
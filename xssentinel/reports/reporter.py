@@ -19,13 +19,14 @@ def render_table(findings: List[Dict]) -> str:
     Render a compact ASCII table for terminal.
     Columns: #, mode, target, exec, refl, sinks, url
     """
-    rows = []
     header = ["#", "mode", "target", "exec", "refl", "sinks", "url"]
-    rows.append(header)
+    rows = [header]
+    # column widths, grown while the rows are built (no second scan)
+    w = [len(h) for h in header]
     for i, f in enumerate(findings, 1):
         target = f.get("param") or f.get("field") or "-"
         sinks = f.get("sinks") or []
-        rows.append([
+        row = [
             str(i),
             f.get("mode", "-"),
             _short(target, 20),
@@ -33,11 +34,7 @@ def render_table(findings: List[Dict]) -> str:
             "✓" if f.get("reflected") else "",
             str(len(sinks)),
             _short(f.get("url", "-"), 80),
-        ])
-    # column widths
-    w = [max(len(r[c]) for r in rows) for c in range(len(header))]
-    lines = []
-    for r in rows:
-        line = "  ".join(r[c].ljust(w[c]) for c in range(len(header)))
-        lines.append(line)
-    return "\n".join(lines)
+        ]
+        w = [max(a, len(cell)) for a, cell in zip(w, row)]
+        rows.append(row)
+    return "\n".join("  ".join(cell.ljust(wc) for cell, wc in zip(r, w)) for r in rows)
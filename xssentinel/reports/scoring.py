@@ -1,3 +1,6 @@
+import heapq
+from collections import Counter
+from functools import lru_cache
 from typing import Dict, Any, List
 
 # Sink weight mapping (rough impact heuristics)
@@ -13,6 +16,11 @@ SINK_WEIGHTS = {
     'history.replaceState': 8,
 }
 
+@lru_cache(maxsize=256)
+def _sink_weight(name: str) -> int:
+    """Sum of the weights whose key prefixes `name` (sink names repeat a lot across hits)."""
+    return sum(w for key, w in SINK_WEIGHTS.items() if name.startswith(key))
+
 def score_hit(hit: Dict[str, Any]) -> Dict[str, Any]:
     """
     Compute a numeric risk score and severity label for a single finding.
@@ -29,11 +37,7 @@ def score_hit(hit: Dict[str, Any]) -> Dict[str, Any]:
 
     # Sinks
     sinks = hit.get('sinks') or []
-    names = [ (s.get('name') or '') for s in sinks ]
-    for nm in names:
-        for key, w in SINK_WEIGHTS.items():
-            if nm.startswith(key):
-                score += w
+    score += sum(_sink_weight(s.get('name') or '') for s in sinks)
 
     # Evidence
     if hit.get('screenshot'):
@@ -74,21 +78,19 @@ def summarize(findings: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Build an executive summary: severity breakdown, mode stats, top items.
     """
+    # Counts (every severity band is always present, even at 0)
+    sev_counts = Counter(f.get('severity', 'Info') for f in findings)
+    mode_counts = Counter(f.get('mode') or 'form' for f in findings)
     out = {
-        'counts_by_severity': {'Critical':0, 'High':0, 'Medium':0, 'Low':0, 'Info':0},
-        'counts_by_mode': {},
+        'counts_by_severity': {'Critical':0, 'High':0, 'Medium':0, 'Low':0, 'Info':0, **sev_counts},
+        'counts_by_mode': dict(mode_counts),
         'top_findings': [],
         'total_findings': len(findings),
     }
-    # Counts
-    for f in findings:
-        sev = f.get('severity', 'Info')
-        out['counts_by_severity'][sev] = out['counts_by_severity'].get(sev, 0) + 1
-        mode = f.get('mode') or 'form'
-        out['counts_by_mode'][mode] = out['counts_by_mode'].get(mode, 0) + 1
 
     # Top 5 by score (break ties by executed/reflected and presence of sinks)
-    sorted_hits = sorted(findings, key=lambda x: (x.get('score',0), x.get('executed', False), len(x.get('sinks') or [])), reverse=True)
+    # nlargest == sorted(..., reverse=True)[:5] (ties included), without sorting everything
+    top_hits = heapq.nlargest(5, findings, key=lambda x: (x.get('score',0), x.get('executed', False), len(x.get('sinks') or [])))
     out['top_findings'] = [{
         'url': h.get('url'),
         'field': h.get('field') or h.get('param'),
@@ -100,6 +102,6 @@ def summarize(findings: List[Dict[str, Any]]) -> Dict[str, Any]:
         'payload': h.get('payload'),
         'trace': h.get('trace'),
         'screenshot': h.get('screenshot'),
-    } for h in sorted_hits[:5]]
+    } for h in top_hits]
 
     return out
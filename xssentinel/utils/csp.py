@@ -5,6 +5,8 @@ from typing import Dict, List, Optional
 def _parse_directive_list(val: str) -> List[str]:
     return [t.strip() for t in val.split() if t.strip()]
 
+_DIRECTIVE_RE = re.compile(r"\s*([^\s;]+)([^;]*)")
+
 def parse_csp(header_value: Optional[str]) -> Dict:
     """
     Parse a CSP header string into a minimal feature set we care about.
@@ -26,17 +28,11 @@ def parse_csp(header_value: Optional[str]) -> Dict:
     }
     if not header_value:
         return info
-    # Split directives by semicolon
-    directives = {}
-    for d in header_value.split(";"):
-        d = d.strip()
-        if not d:
-            continue
-        if " " in d:
-            name, val = d.split(" ", 1)
-        else:
-            name, val = d, ""
-        directives[name.lower()] = val.strip()
+    # Directive name + raw value in one scan; values stay untokenized except script-src.
+    # Per CSP, a repeated directive is ignored after its first occurrence.
+    directives: Dict[str, str] = {}
+    for m in _DIRECTIVE_RE.finditer(header_value):
+        directives.setdefault(m.group(1).lower(), m.group(2).strip())
 
     script_src = directives.get("script-src")
     if not script_src:
@@ -50,3 +46,22 @@ def parse_csp(header_value: Optional[str]) -> Dict:
         info["allows_data"] = ("data:" in tokens)
         info["allows_blob"] = ("blob:" in tokens)
     return info
+
+_META_CSP_RE = re.compile(
+    r"""<meta\b[^>]*http-equiv\s*=\s*["']?content-security-policy["']?[^>]*>""",
+    re.IGNORECASE,
+)
+_CONTENT_ATTR_RE = re.compile(r"""\bcontent\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+
+def extract_meta_csp(html: str) -> Optional[str]:
+    """
+    Return the content of <meta http-equiv="content-security-policy"> from raw HTML,
+    for callers that fetched the document over plain HTTP (no DOM available).
+    """
+    m = _META_CSP_RE.search(html or "")
+    if not m:
+        return None
+    c = _CONTENT_ATTR_RE.search(m.group(0))
+    if not c:
+        return None
+    return next(g for g in c.groups() if g is not None)
@@ -3,13 +3,12 @@ import urllib.parse
 def url_encode(s: str) -> str:
     return urllib.parse.quote(s, safe='')
 
+# Single-pass translate tables (same output as the chained replace() calls)
+_HTML_ESC = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'})
+_JS_ESC = str.maketrans({'\\': '\\\\', '\n': '\\n', '\r': '\\r', "'": "\\'", '"': '\\"'})
+
 def html_escape(s: str) -> str:
-    return (s
-            .replace('&', '&amp;')
-            .replace('<', '&lt;')
-            .replace('>', '&gt;')
-            .replace('"', '&quot;')
-            .replace("'", '&#x27;'))
+    return s.translate(_HTML_ESC)
 
 def js_string_escape(s: str) -> str:
-    return s.replace('\\', '\\\\').replace('\n', '\\n').replace('\r', '\\r').replace("'", "\\'").replace('"', '\\"')
+    return s.translate(_JS_ESC)